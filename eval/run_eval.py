@@ -5,15 +5,20 @@ Usage:
     python3 -m eval.run_eval                     # run every case in eval/cases
     python3 -m eval.run_eval --case foo          # run just foo.json
     python3 -m eval.run_eval --verbose           # echo extra diagnostics
+    python3 -m eval.run_eval --jobs 1            # run cases serially (no process pool)
 """
 
 from __future__ import annotations
 
 import argparse
+import functools
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import json
+import multiprocessing
+import os
 import sys
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterable, List, Tuple
 
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
@@ -24,26 +29,49 @@ from src.skill import run_compare  # noqa
 CASES_DIR = Path(__file__).resolve().parent / "cases"
 
 
+def _case_paths(name: str | None = None) -> List[Path]:
+    """Case files in CASES_DIR; a single direct lookup when a name is given."""
+    if name is not None:
+        path = CASES_DIR / f"{name}.json"
+        # reject path separators so a case name can't escape CASES_DIR
+        return [path] if Path(name).name == name and path.is_file() else []
+    with os.scandir(CASES_DIR) as entries:
+        return sorted(Path(e.path) for e in entries if e.name.endswith(".json") and e.is_file())
+
+
 def _load_case(path: Path) -> Dict[str, object]:
-    with path.open() as f:
+    return _load_case_cached(str(path), os.stat(path).st_mtime_ns)
+
+
+@functools.lru_cache(maxsize=None)
+def _load_case_cached(path: str, mtime_ns: int) -> Dict[str, object]:
+    # mtime_ns is part of the cache key so edited case files are re-read.
+    with open(path) as f:
         data = json.load(f)
-    data.setdefault("name", path.stem)
+    data.setdefault("name", Path(path).stem)
     return data
 
 
-def _evaluate_case(case: Dict[str, object]) -> tuple[List[str], Dict[str, object]]:
-    """Run the pipeline for a given case and collect human-friendly errors."""
+def _evaluate_case(case: Dict[str, object], runs: Dict[tuple, Dict] | None = None) -> tuple[List[str], Dict[str, object]]:
+    """
+    Run the pipeline for a given case and collect human-friendly errors.
+
+    runs memoizes pipeline results by SKU pair for the current run_cases call
+    (cases often share a pair); None runs the pipeline every time.
+    """
     errors: List[str] = []
     try:
-        result = run_compare(
-            case["client_id"],
-            case["competitor_id"],
-            csv_path=case.get("csv_path", "data/asin_data_filled.csv"),
-            market=case.get("market", "AE"),
-        )
+        csv_path = case.get("csv_path", "data/asin_data_filled.csv")
+        market = case.get("market", "AE")
+        key = (case["client_id"], case["competitor_id"], csv_path, market)
+        result = runs.get(key) if runs is not None else None
+        if result is None:
+            result = run_compare(case["client_id"], case["competitor_id"], csv_path=csv_path, market=market)
+            if runs is not None:
+                runs[key] = result
     except Exception as exc:  # pragma: no cover - defensive
         errors.append(f"runtime error: {exc}")
-        return errors
+        return errors, {}
 
     suggestions = result.get("suggestions") or []
     info: Dict[str, object] = {
@@ -53,36 +81,44 @@ def _evaluate_case(case: Dict[str, object]) -> tuple[List[str], Dict[str, object
         "suggestion_sections": [],
         "draft_snapshot": {},
     }
-    sections = [s.get("section") for s in suggestions if isinstance(s, dict)]
-    info["suggestion_sections"] = sections
     expectations: Dict[str, object] = case.get("expectations", {})
 
+    # Single pass over suggestions; the checks below only consult these.
+    sections: List[object] = []
+    changed: set = set()
+    first_missing_refs = 0
+    for idx, sugg in enumerate(suggestions, start=1):
+        if not isinstance(sugg, dict):
+            if not first_missing_refs:
+                first_missing_refs = idx
+            continue
+        section = sugg.get("section")
+        if isinstance(section, str):
+            section = sys.intern(section)
+        sections.append(section)
+        after = sugg.get("after")
+        if after is not None and after != sugg.get("before"):
+            changed.add(section)
+        if not first_missing_refs and not sugg.get("references"):
+            first_missing_refs = idx
+    info["suggestion_sections"] = sections
+
     min_suggestions = expectations.get("min_suggestions")
     if isinstance(min_suggestions, int) and len(suggestions) < min_suggestions:
         errors.append(f"expected >= {min_suggestions} suggestions, saw {len(suggestions)}")
 
     required_sections = expectations.get("required_sections") or []
-    missing_sections = [sec for sec in required_sections if sec not in sections]
+    present_sections = set(sections)
+    missing_sections = [sec for sec in required_sections if sec not in present_sections]
     if missing_sections:
         errors.append(f"missing sections in suggestions: {', '.join(missing_sections)}")
 
-    if expectations.get("require_references"):
-        for idx, sugg in enumerate(suggestions, start=1):
-            refs = sugg.get("references") if isinstance(sugg, dict) else []
-            if not refs:
-                errors.append(f"suggestion #{idx} has no references")
-                break
+    if expectations.get("require_references") and first_missing_refs:
+        errors.append(f"suggestion #{first_missing_refs} has no references")
 
     changed_sections = expectations.get("require_changed_sections") or []
     for sec in changed_sections:
-        changed = any(
-            (s.get("section") == sec)
-            and (s.get("after") is not None)
-            and (s.get("after") != s.get("before"))
-            for s in suggestions
-            if isinstance(s, dict)
-        )
-        if not changed:
+        if sec not in changed:
             errors.append(f"no suggestion produced a change for section '{sec}'")
 
     draft_expectations = expectations.get("draft") or {}
@@ -90,9 +126,10 @@ def _evaluate_case(case: Dict[str, object]) -> tuple[List[str], Dict[str, object
     if draft:
         bullets_raw = draft.get("bullets") or []
         if isinstance(bullets_raw, str):
-            bullets_list = [bullets_raw]
+            bullets_list = [sys.intern(bullets_raw)]
         else:
-            bullets_list = list(bullets_raw)
+            # Suites reuse the same boilerplate bullets; share one copy of each.
+            bullets_list = [sys.intern(b) if isinstance(b, str) else b for b in bullets_raw]
         info["draft_snapshot"] = {
             "title_len": len(draft.get("title", "")),
             "bullets_count": len(bullets_list),
@@ -117,6 +154,38 @@ def _evaluate_case(case: Dict[str, object]) -> tuple[List[str], Dict[str, object
     return errors, info
 
 
+def _run_case(path: Path, runs: Dict[tuple, Dict] | None = None) -> Tuple[Dict[str, object], List[str], Dict[str, object]]:
+    case = _load_case(path)
+    errors, info = _evaluate_case(case, runs)
+    return case, errors, info
+
+
+def run_cases(case_paths: List[Path], workers: int | None = None, *, threads: bool = False) -> Iterable[Tuple[Dict[str, object], List[str], Dict[str, object]]]:
+    """
+    Evaluate cases, fanning out to a process pool (or a thread pool with
+    threads=True); results keep input order.
+
+    Pipeline results are only reused within this call, so every call sees the
+    current catalog, policy packs and LLM output. Inline and thread runs share
+    one memo across cases; process workers don't share memory, so there each
+    case runs the pipeline itself.
+    """
+    workers = workers or os.cpu_count() or 1
+    runs: Dict[tuple, Dict] = {}
+    if workers <= 1 or len(case_paths) <= 1:
+        return [_run_case(p, runs) for p in case_paths]
+    workers = min(workers, len(case_paths))
+    if threads:
+        # Per-case cost is the LLM round-trip, which releases the GIL.
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            return list(ex.map(functools.partial(_run_case, runs=runs), case_paths))
+    # spawn, not fork: forking a threaded process (e.g. a server) can leave
+    # children holding copies of locks taken by other threads, and the
+    # google-generativeai grpc state is not fork-safe.
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as ex:
+        return list(ex.map(_run_case, case_paths))
+
+
 def _print_debug(info: Dict[str, object]) -> None:
     """Pretty-print core signals to help validate failures."""
     if not info:
@@ -154,24 +223,25 @@ def main() -> int:
         action="store_true",
         help="Print extra diagnostics (always shown on failures).",
     )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="Worker processes for running cases (default: CPU count; 1 runs inline).",
+    )
     args = parser.parse_args()
 
     if not CASES_DIR.exists():
         print("No cases found. Add JSON files under eval/cases.", file=sys.stderr)
         return 1
 
-    case_paths = sorted(CASES_DIR.glob("*.json"))
-    if args.case:
-        matches = [p for p in case_paths if p.stem == args.case]
-        if not matches:
-            print(f"Case '{args.case}' not found.", file=sys.stderr)
-            return 1
-        case_paths = matches
+    case_paths = _case_paths(args.case or None)
+    if args.case and not case_paths:
+        print(f"Case '{args.case}' not found.", file=sys.stderr)
+        return 1
 
     overall_errors = 0
-    for path in case_paths:
-        case = _load_case(path)
-        errors, info = _evaluate_case(case)
+    for case, errors, info in run_cases(case_paths, args.jobs):
         if errors:
             overall_errors += 1
             print(f"[FAIL] {case['name']}")
@@ -1,24 +1,33 @@
 from __future__ import annotations
 
-from dataclasses import asdict, is_dataclass
+from contextlib import asynccontextmanager
+from dataclasses import asdict, fields, is_dataclass
+from functools import lru_cache, singledispatch
+import hashlib
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import HTMLResponse
-from pydantic import BaseModel, Field
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import HTMLResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field, TypeAdapter
+from dotenv import load_dotenv
 import httpx
 import markdown2
+import orjson
 import os
 
 from .skill import run_compare, _coerce_list
-from .loaders import load_csv, select_skus
+from .loaders import load_indexed_csv, select_skus
+from .models import ComparisonRow, Finding, SKU
 from .preprocess import preprocess
-from .rules_registry import load_all_rules, select_rules
+from .rules_registry import compiled_rules_cached, known_markets, load_all_rules_cached, policies_fingerprint
 from .rules_engine import validate_with_rules
-from eval.run_eval import CASES_DIR as EVAL_CASES_DIR, _load_case as eval_load_case, _evaluate_case as eval_evaluate_case, _print_debug as eval_print_debug
+from eval.run_eval import _case_paths as eval_case_paths, run_cases as eval_run_cases, _print_debug as eval_print_debug
 
 SLIDE_PATH = Path(__file__).resolve().parents[1] / "static" / "demo_slide.html"
+POLICY_ROOT = "data/policies"
+COMPARE_CACHE_CONTROL = "private, max-age=60"
 
 # ---------- Pydantic DTOs ----------
 
@@ -112,6 +121,7 @@ class FinalizeRequest(BaseModel):
     market: str = "AE"
     csv_path: str = "data/asin_data_filled.csv"
     draft: DraftPayload
+    include_findings: bool = Field(default=True, description="Re-validate the draft and include policy findings.")
 
 
 class FinalizeResponse(BaseModel):
@@ -150,34 +160,62 @@ class EvalResponse(BaseModel):
 
 # ---------- Serialization helpers ----------
 
-def _serialize_finding(finding: Any) -> FindingDTO:
-    data = _coerce_to_dict(finding)
-    severity = getattr(finding, "severity", data.get("severity"))
-    payload = {
+_FINDINGS_ADAPTER = TypeAdapter(List[FindingDTO])
+_SUGGESTIONS_ADAPTER = TypeAdapter(List[SuggestionDTO])
+_COMPARISON_ADAPTER = TypeAdapter(List[ComparisonRowDTO])
+
+
+@singledispatch
+def _to_dict(obj: Any) -> Dict[str, Any]:
+    # Unknown types go through the generic reflection path.
+    return _coerce_to_dict(obj)
+
+
+@_to_dict.register(dict)
+def _(obj: Dict[str, Any]) -> Dict[str, Any]:
+    return obj
+
+
+@lru_cache(maxsize=None)
+def _field_names(cls: type) -> tuple:
+    return tuple(f.name for f in fields(cls))
+
+
+@_to_dict.register(Finding)
+@_to_dict.register(ComparisonRow)
+@_to_dict.register(SKU)
+def _(obj: Any) -> Dict[str, Any]:
+    # Shallow read; asdict() would deep-copy every nested list only for the
+    # DTO validation to copy it again.
+    return {name: getattr(obj, name) for name in _field_names(type(obj))}
+
+
+def _finding_payload(finding: Any) -> Dict[str, Any]:
+    data = _to_dict(finding)
+    return {
         "section": data.get("section"),
         "rule_id": data.get("rule_id"),
         "passed": data.get("passed"),
         "message": data.get("message"),
         "citation": data.get("citation"),
-        "severity": severity,
+        "severity": data.get("severity"),
+    }
+
+
+def _comparison_payload(row: Any) -> Dict[str, Any]:
+    data = _to_dict(row)
+    return {
+        "section": data.get("section"),
+        "metric": data.get("metric"),
+        "client": data.get("client"),
+        "competitor": data.get("competitor"),
+        "gap": data.get("gap"),
+        "compliance_notes": data.get("compliance_notes") or [],
     }
-    return FindingDTO(**payload)
-
-
-def _serialize_comparison(row: Any) -> ComparisonRowDTO:
-    data = _coerce_to_dict(row)
-    return ComparisonRowDTO(
-        section=data.get("section"),
-        metric=data.get("metric"),
-        client=data.get("client"),
-        competitor=data.get("competitor"),
-        gap=data.get("gap"),
-        compliance_notes=data.get("compliance_notes") or [],
-    )
 
 
 def _serialize_sku(sku: Any) -> SKUDetailsDTO:
-    data = _coerce_to_dict(sku)
+    data = _to_dict(sku)
     return SKUDetailsDTO(
         sku_id=data.get("sku_id", ""),
         title=data.get("title", ""),
@@ -188,21 +226,52 @@ def _serialize_sku(sku: Any) -> SKUDetailsDTO:
     )
 
 
-def _serialize_suggestion(s: Dict[str, Any]) -> SuggestionDTO:
+def _suggestion_payload(s: Dict[str, Any]) -> Dict[str, Any]:
     # Ensure lists instead of None
-    references = s.get("references") or []
-    return SuggestionDTO(
-        section=s.get("section", "unknown"),
-        title=s.get("title", "Suggestion"),
-        before=s.get("before"),
-        after=s.get("after"),
-        rationale=s.get("rationale", ""),
-        references=references,
-    )
+    return {
+        "section": s.get("section", "unknown"),
+        "title": s.get("title", "Suggestion"),
+        "before": s.get("before"),
+        "after": s.get("after"),
+        "rationale": s.get("rationale", ""),
+        "references": s.get("references") or [],
+    }
 
 
 def _serialize_findings_bucket(findings: List[Any]) -> List[FindingDTO]:
-    return [_serialize_finding(f) for f in findings]
+    # One pydantic-core call for the whole list instead of one per finding.
+    return _FINDINGS_ADAPTER.validate_python([_finding_payload(f) for f in findings])
+
+
+def _serialize_suggestions(suggestions: List[Dict[str, Any]]) -> List[SuggestionDTO]:
+    return _SUGGESTIONS_ADAPTER.validate_python([_suggestion_payload(s) for s in suggestions])
+
+
+def _serialize_comparison(rows: List[Any]) -> List[ComparisonRowDTO]:
+    return _COMPARISON_ADAPTER.validate_python([_comparison_payload(r) for r in rows])
+
+
+def _json_response(payload: Dict[str, Any]) -> Response:
+    # Every JSON route encodes once with orjson, as /compare does; response_model still drives the schema.
+    return Response(orjson.dumps(payload), media_type="application/json")
+
+
+async def _stream_json(payload: Dict[str, Any]):
+    # Emit one chunk per top-level field and per list item so large
+    # comparison tables start flowing before the whole body is encoded.
+    sep = b"{"
+    for key, value in payload.items():
+        yield sep + orjson.dumps(key) + b":"
+        sep = b","
+        if isinstance(value, list):
+            item_sep = b"["
+            for item in value:
+                yield item_sep + orjson.dumps(item)
+                item_sep = b","
+            yield b"[]" if item_sep == b"[" else b"]"
+        else:
+            yield orjson.dumps(value)
+    yield b"}" if sep == b"," else b"{}"
 
 
 def _coerce_to_dict(obj: Any) -> Dict[str, Any]:
@@ -225,10 +294,29 @@ def _coerce_to_dict(obj: Any) -> Dict[str, Any]:
 
 # ---------- FastAPI application ----------
 
+@asynccontextmanager
+async def _lifespan(_app: FastAPI):
+    # Pre-select rules for every market the packs mention, so /validate and
+    # /finalize only do a dict lookup (plus the policy fingerprint check) per request.
+    try:
+        markets = known_markets(load_all_rules_cached(POLICY_ROOT))
+        for market in {os.getenv("CIQ_DEFAULT_MARKET", "AE"), *markets}:
+            _load_rules(market)
+    except OSError:
+        pass  # policies missing at boot; handlers will surface the error
+    # One pooled client for Mailjet so repeated /email calls reuse the TLS connection.
+    _app.state.http = _new_http_client()
+    try:
+        yield
+    finally:
+        await _app.state.http.aclose()
+
+
 app = FastAPI(
     title="CIQ Ally — Competitor Content Intelligence API",
     version="1.0.0",
     description="LLM-assisted SKU comparison service that powers the CIQ Ally demo.",
+    lifespan=_lifespan,
 )
 
 
@@ -240,38 +328,30 @@ def demo_slide() -> HTMLResponse:
 
 
 @app.post("/compare", response_model=CompareResponse)
-def compare(req: CompareRequest) -> CompareResponse:
+async def compare(req: CompareRequest, request: Request) -> Response:
     try:
-        result = run_compare(
-            client_id=req.client_id,
-            competitor_id=req.competitor_id,
-            csv_path=req.csv_path,
-            market=req.market,
-        )
+        etag, result = await run_in_threadpool(_compare_unless_fresh, req, request.headers.get("if-none-match"))
+        if result is None:
+            return Response(status_code=304, headers={"ETag": etag, "Cache-Control": COMPARE_CACHE_CONTROL})
     except FileNotFoundError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
     except Exception as exc:  # pragma: no cover - bubble unexpected errors
         raise HTTPException(status_code=500, detail=str(exc)) from exc
 
-    findings = {
-        "client": _serialize_findings_bucket(result.get("findings", {}).get("client", [])),
-        "competitor": _serialize_findings_bucket(result.get("findings", {}).get("competitor", [])),
-    }
-    suggestions = [_serialize_suggestion(s) for s in result.get("suggestions", [])]
-
-    include_report = getattr(req, "include_report", True)
-    include_draft = getattr(req, "include_draft", True)
-    include_suggestions = getattr(req, "include_suggestions", True)
-    include_findings = getattr(req, "include_findings", True)
-    include_comparison = getattr(req, "include_comparison", True)
-
-    report_markdown = result.get("report_markdown", "") if include_report else ""
-    draft_payload = DraftDTO(**result.get("draft", {})) if include_draft else DraftDTO(title="", bullets=[], description="")
-    suggestions_payload = suggestions if include_suggestions else []
-    findings_payload = findings if include_findings else {"client": [], "competitor": []}
-    comparison_payload = [_serialize_comparison(row) for row in result.get("comparison", [])] if include_comparison else []
+    report_markdown = result.get("report_markdown", "") if req.include_report else ""
+    draft_payload = DraftDTO(**result.get("draft", {})) if req.include_draft else DraftDTO(title="", bullets=[], description="")
+    suggestions_payload = _serialize_suggestions(result.get("suggestions", [])) if req.include_suggestions else []
+    if req.include_findings:
+        findings_payload = {
+            "client": _serialize_findings_bucket(result.get("findings", {}).get("client", [])),
+            "competitor": _serialize_findings_bucket(result.get("findings", {}).get("competitor", [])),
+        }
+    else:
+        findings_payload = {"client": [], "competitor": []}
+    comparison_payload = _serialize_comparison(result.get("comparison", [])) if req.include_comparison else []
 
-    response = CompareResponse(
+    # Every field is already a validated DTO, so skip the outer validation pass.
+    response = CompareResponse.model_construct(
         report_markdown=report_markdown,
         draft=draft_payload,
         suggestions=suggestions_payload,
@@ -280,49 +360,46 @@ def compare(req: CompareRequest) -> CompareResponse:
         client=_serialize_sku(result.get("client")),
         competitor=_serialize_sku(result.get("competitor")),
     )
-    return response
+    # Returning a Response skips FastAPI's second validation pass over the
+    # already-built model; response_model above still drives the OpenAPI schema.
+    return StreamingResponse(
+        _stream_json(response.model_dump()),
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": COMPARE_CACHE_CONTROL},
+    )
 
 
 @app.post("/validate", response_model=ValidateResponse)
-def validate(req: ValidateRequest) -> ValidateResponse:
-    client = _load_client(req.client_id, req.csv_path)
+async def validate(req: ValidateRequest) -> Response:
     draft = _sanitize_draft(req.draft)
-
-    client.title = draft.title
-    client.bullets = draft.bullets
-    client.description = draft.description
-
-    rules = _load_rules(req.market)
-    findings = validate_with_rules(client, rules)
-    serialized = [_serialize_finding(f) for f in findings]
+    _, findings = await run_in_threadpool(_validate_draft, req.client_id, req.csv_path, req.market, draft)
+    serialized = _serialize_findings_bucket(findings)
     passed = all(f.passed for f in findings)
-    return ValidateResponse(passed=passed, findings=serialized)
+    return _json_response(ValidateResponse.model_construct(passed=passed, findings=serialized).model_dump())
 
 
 @app.post("/finalize", response_model=FinalizeResponse)
-def finalize(req: FinalizeRequest) -> FinalizeResponse:
-    client = _load_client(req.client_id, req.csv_path)
+async def finalize(req: FinalizeRequest) -> Response:
     draft = _sanitize_draft(req.draft)
-
-    client.title = draft.title
-    client.bullets = draft.bullets
-    client.description = draft.description
-
-    rules = _load_rules(req.market)
-    findings = validate_with_rules(client, rules)
-    serialized = [_serialize_finding(f) for f in findings]
+    if req.include_findings:
+        client, findings = await run_in_threadpool(_validate_draft, req.client_id, req.csv_path, req.market, draft)
+        serialized = _serialize_findings_bucket(findings)
+    else:
+        client = await run_in_threadpool(_load_client, req.client_id, req.csv_path)
+        serialized = []
 
     final_markdown = _render_final_markdown(client.sku_id, draft)
-    return FinalizeResponse(final_markdown=final_markdown, draft=draft, findings=serialized)
+    response = FinalizeResponse.model_construct(final_markdown=final_markdown, draft=draft, findings=serialized)
+    return _json_response(response.model_dump())
 
 
 @app.post("/email", response_model=EmailResponse)
-async def send_email(req: EmailRequest) -> EmailResponse:
-    cfg = _mailjet_config()
+async def send_email(req: EmailRequest, request: Request) -> Response:
+    cfg = _MAILJET_CFG
     if not cfg:
         raise HTTPException(status_code=500, detail="Mailjet settings not configured")
 
-    html_body = markdown2.markdown(req.body_markdown or "")
+    html_body = _render_md(req.body_markdown or "")
     from_email = req.from_email or cfg["from_email"]
     from_name = cfg.get("from_name") or "CIQ Ally"
 
@@ -339,52 +416,104 @@ async def send_email(req: EmailRequest) -> EmailResponse:
     }
 
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            resp = await client.post(
-                "https://api.mailjet.com/v3.1/send",
-                json=payload,
-                auth=(cfg["api_key"], cfg["secret_key"]),
-            )
+        resp = await _http_client(request.app).post(
+            "https://api.mailjet.com/v3.1/send",
+            json=payload,
+            auth=(cfg["api_key"], cfg["secret_key"]),
+        )
         if resp.status_code != 200:
             raise HTTPException(status_code=500, detail=resp.text)
     except Exception as exc:
         raise HTTPException(status_code=500, detail=str(exc)) from exc
 
-    return EmailResponse(status="sent")
+    return _json_response(EmailResponse(status="sent").model_dump())
 
 
 @app.post("/eval", response_model=EvalResponse)
-def run_eval(req: EvalRequest) -> EvalResponse:
-    case_paths = sorted(EVAL_CASES_DIR.glob("*.json"))
-    if req.case:
-        match = [p for p in case_paths if p.stem == req.case]
-        if not match:
-            raise HTTPException(status_code=404, detail=f"Case '{req.case}' not found.")
-        case_paths = match
+async def run_eval(req: EvalRequest) -> Response:
+    case_paths = eval_case_paths(req.case or None)
+    if req.case and not case_paths:
+        raise HTTPException(status_code=404, detail=f"Case '{req.case}' not found.")
 
     results: List[EvalCaseResult] = []
     overall_pass = True
 
-    for path in case_paths:
-        case = eval_load_case(path)
-        errors, info = eval_evaluate_case(case)
+    # Cases are independent; run_cases fans them out and keeps file order.
+    # Threads, not processes: this runs inside the server, and each case is
+    # dominated by the LLM round-trip. The pool blocks, so keep it off the event loop.
+    for case, errors, info in await run_in_threadpool(eval_run_cases, case_paths, threads=True):
         passed = not errors
         overall_pass = overall_pass and passed
         payload = info if req.verbose else {}
         results.append(EvalCaseResult(name=case["name"], passed=passed, errors=errors, info=payload))
 
-    return EvalResponse(overall_pass=overall_pass, results=results)
+    return _json_response(EvalResponse(overall_pass=overall_pass, results=results).model_dump())
 
 
 def _load_client(client_id: str, csv_path: str):
-    df = load_csv(csv_path)
-    client_row, _ = select_skus(df, client_id, client_id)
+    df, sku_index = load_indexed_csv(csv_path)
+    client_row, _ = select_skus(df, client_id, client_id, index=sku_index)
     return preprocess(client_row)
 
 
+def _compare_etag(req: CompareRequest) -> str:
+    """Fingerprint of everything a /compare response depends on, incl. catalog mtime and policy fingerprint."""
+    key = "|".join(
+        str(part)
+        for part in (
+            req.client_id,
+            req.competitor_id,
+            req.market,
+            os.path.abspath(req.csv_path),
+            os.stat(req.csv_path).st_mtime_ns,
+            policies_fingerprint(POLICY_ROOT),
+            req.include_report,
+            req.include_comparison,
+            req.include_findings,
+            req.include_suggestions,
+            req.include_draft,
+        )
+    )
+    return '"%s"' % hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    # No '*' handling: on a POST, RFC 9110 answers If-None-Match: * with 412, never 304.
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag in candidates
+
+
+def _compare_unless_fresh(req: CompareRequest, if_none_match: Optional[str]) -> Tuple[str, Optional[Dict[str, Any]]]:
+    """Blocking part of /compare: (etag, run_compare result), or (etag, None) when the client's copy is current."""
+    # The ETag stats the CSV and scans the policy tree, so it runs here, off the event loop.
+    etag = _compare_etag(req)
+    if _etag_matches(if_none_match, etag):
+        return etag, None
+    return etag, run_compare(
+        client_id=req.client_id,
+        competitor_id=req.competitor_id,
+        csv_path=req.csv_path,
+        market=req.market,
+        include_report=req.include_report,
+        include_suggestions=req.include_suggestions,
+        include_draft=req.include_draft,
+        include_comparison=req.include_comparison,
+    )
+
+
+def _validate_draft(client_id: str, csv_path: str, market: str, draft: DraftDTO):
+    """Blocking part of /validate and /finalize: load the client and run rules on the draft."""
+    client = _load_client(client_id, csv_path)
+    client.title = draft.title
+    client.bullets = draft.bullets
+    client.description = draft.description
+    return client, validate_with_rules(client, _load_rules(market))
+
+
 def _load_rules(market: str):
-    packs = load_all_rules("data/policies")
-    return select_rules(packs, market=market, categories=[])
+    return compiled_rules_cached(market, root=POLICY_ROOT)
 
 
 def _sanitize_draft(draft: DraftPayload) -> DraftDTO:
@@ -395,29 +524,35 @@ def _sanitize_draft(draft: DraftPayload) -> DraftDTO:
 
 
 def _render_final_markdown(sku_id: str, draft: DraftDTO) -> str:
-    lines = [
-        f"# FINAL – {sku_id}",
-        "",
-        "## Title",
-        draft.title or "(empty)",
-        "",
-        "## Bullets",
-    ]
-    if draft.bullets:
-        lines.extend(f"- {bullet}" for bullet in draft.bullets)
-    else:
-        lines.append("(none)")
-    lines.extend(
-        [
-            "",
-            "## Description",
-            draft.description or "(empty)",
-        ]
+    bullets_md = "\n".join(f"- {bullet}" for bullet in draft.bullets) if draft.bullets else "(none)"
+    return (
+        f"# FINAL – {sku_id}\n\n"
+        f"## Title\n{draft.title or '(empty)'}\n\n"
+        f"## Bullets\n{bullets_md}\n\n"
+        f"## Description\n{draft.description or '(empty)'}"
     )
-    return "\n".join(lines)
+
+
+@lru_cache(maxsize=256)
+def _render_md(body: str) -> str:
+    # Bulk sends usually repeat the same draft body across recipients.
+    return markdown2.markdown(body)
+
+
+def _new_http_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(timeout=10.0, limits=httpx.Limits(max_keepalive_connections=20))
+
+
+def _http_client(owner: FastAPI) -> httpx.AsyncClient:
+    client = getattr(owner.state, "http", None)
+    if client is None or client.is_closed:
+        # lifespan did not run (e.g. app mounted without startup events)
+        client = owner.state.http = _new_http_client()
+    return client
 
 
 def _mailjet_config() -> Optional[Dict[str, Any]]:
+    load_dotenv()
     api_key = os.getenv("MAILJET_API_KEY")
     secret_key = os.getenv("MAILJET_SECRET_KEY")
     from_email = os.getenv("MAILJET_FROM_EMAIL")
@@ -431,3 +566,7 @@ def _mailjet_config() -> Optional[Dict[str, Any]]:
         "from_email": from_email,
         "from_name": from_name,
     }
+
+
+# Read once at import; restart the server after changing Mailjet settings.
+_MAILJET_CFG = _mailjet_config()
@@ -1,25 +1,76 @@
 # src/app_streamlit.py
 import os
+import re
 import streamlit as st
-from typing import List, Dict, Any
+from typing import List
 
 import sys
+from functools import lru_cache
 from pathlib import Path
 ROOT = Path(__file__).resolve().parents[1]  # repo root
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
 # --- Your pipeline imports (adjust if paths differ)
-from src.loaders import load_csv, select_skus
-from src.preprocess import preprocess
+from src.loaders import build_sku_index, load_csv, select_skus
+from src.preprocess import preprocess_many
 from src.scoring import score_all
 from src.compare import compare_sections
 from src.render import render_markdown_report
-from src.rules_registry import load_all_rules, select_rules
-from src.rules_engine import validate_with_rules
+from src.rules_registry import load_all_rules, policies_fingerprint, select_rules, styleguide_refs
+from src.rules_engine import compile_rules, validate_with_rules
 from src.recommender import suggest_edits_llm  # uses your LLM backend
 from src.models import SKU, Recommendation, Finding
 
+# Chat commands
+_EDIT_BULLET_RE = re.compile(r"edit bullet\s+(\d+)\s*:\s*(.+)", re.I)
+_APPROVE_SET = frozenset({"approve", "finalize", "approve all"})
+
+@lru_cache(maxsize=64)
+def _split_bullet_lines(text: str) -> tuple:
+    """Bullets textarea -> non-empty stripped lines; reruns reuse the same text."""
+    return tuple(line for b in text.split("\n") if (line := b.strip()))
+
+# ---------------- Cached loaders ----------------
+# Keyed on the CSV mtime / policy fingerprint so edits to the CSV / policy packs invalidate the cache.
+@st.cache_data(show_spinner=False)
+def _cached_csv(path: str, mtime_ns: int):
+    df = load_csv(path)
+    return df, build_sku_index(df)
+
+@st.cache_data(show_spinner=False)
+def _cached_packs(root: str, fingerprint: tuple):
+    return load_all_rules(root)
+
+@st.cache_data(show_spinner=False)
+def _cached_pair(path: str, mtime_ns: int, client_id: str, competitor_id: str):
+    df, sku_index = _cached_csv(path, mtime_ns)
+    client_row, comp_row = select_skus(df, client_id, competitor_id, index=sku_index)
+    client_p, comp_p = preprocess_many((client_row, comp_row))
+    return client_p, comp_p
+
+def load_preprocessed_pair(path: str, client_id: str, competitor_id: str):
+    """(client, competitor) SKUs after preprocess, shared across reruns."""
+    return _cached_pair(path, os.stat(path).st_mtime_ns, client_id, competitor_id)
+
+@st.cache_resource(show_spinner=False)
+def _cached_rules(market: str, fingerprint: tuple):
+    return select_rules(_cached_packs("data/policies", fingerprint), market=market, categories=[])
+
+@st.cache_resource(show_spinner=False)
+def _cached_compiled_rules(market: str, fingerprint: tuple):
+    return compile_rules(_cached_rules(market, fingerprint))
+
+def load_market_rules(market: str):
+    return _cached_compiled_rules(market, policies_fingerprint("data/policies"))
+
+@st.cache_resource(show_spinner=False)
+def _cached_refs(market: str, fingerprint: tuple):
+    return styleguide_refs(_cached_rules(market, fingerprint))
+
+def load_styleguide_refs(market: str):
+    return _cached_refs(market, policies_fingerprint("data/policies"))
+
 # ---------------- Session state helpers ----------------
 from typing import Optional
 
@@ -85,13 +136,10 @@ def add_user(msg: str):
 
 # ---------------- Core actions ----------------
 def run_compare(client_id: str, competitor_id: str, csv_path: str, market: str = "AE"):
-    df = load_csv(csv_path)
-    client_row, comp_row = select_skus(df, client_id, competitor_id)
-    client_p, comp_p = preprocess(client_row), preprocess(comp_row)
+    client_p, comp_p = load_preprocessed_pair(csv_path, client_id, competitor_id)
 
-    packs = load_all_rules("data/policies")
     # For now: apply rules to all categories
-    rules = select_rules(packs, market=market, categories=[])
+    rules = load_market_rules(market)
 
     client_find: List[Finding] = validate_with_rules(client_p, rules)
     comp_find: List[Finding]   = validate_with_rules(comp_p, rules)
@@ -101,7 +149,7 @@ def run_compare(client_id: str, competitor_id: str, csv_path: str, market: str =
 
     comparison = compare_sections(client_p, comp_p, client_scores, comp_scores, client_find, comp_find)
 
-    styleguide_refs = [f"{r.get('policy_id','')}:{r['id']} – {r.get('message','')}".strip(": ") for r in rules]
+    styleguide_refs = load_styleguide_refs(market)
     recs_raw = suggest_edits_llm(client_p, comp_p, comparison, styleguide_refs)
     recs = normalize_recs(recs_raw)  # ← normalize here
 
@@ -141,7 +189,7 @@ def run_compare(client_id: str, competitor_id: str, csv_path: str, market: str =
 
     return client_p, comp_p, report_md
 
-def revalidate_current_draft(sku: SKU, rules: List[Dict[str, Any]]):
+def revalidate_current_draft(sku: SKU, rules: List):
     """Validate current draft sections by temporarily creating a SKU-like object."""
     # Build a shallow clone with overridden fields
     class _Temp(SKU): pass
@@ -227,7 +275,7 @@ def main():
     with col2:
         bullets_str = "\n".join(st.session_state.draft.get("bullets", []))
         new_bullets = st.text_area("Bullets (one per line)", value=bullets_str, height=14, key="draft_bullets")
-        st.session_state.draft["bullets"] = [b.strip() for b in new_bullets.split("\n") if b.strip()]
+        st.session_state.draft["bullets"] = list(_split_bullet_lines(new_bullets))
 
     # Chat input for quick edit commands
     st.subheader("💬 Chat")
@@ -244,20 +292,17 @@ def main():
         txt = user_msg.strip().lower()
 
         # Approve
-        if txt in {"approve", "finalize", "approve all"}:
+        if txt in _APPROVE_SET:
             st.session_state.approved = True
             add_bot("Approved. Generating final Markdown…")
             # We need client_p/comp_p to render final; re-run a light load
-            df = load_csv(csv_path)
-            client_row, comp_row = select_skus(df, client_id, competitor_id)
-            client_p, comp_p = preprocess(client_row), preprocess(comp_row)
+            client_p, comp_p = load_preprocessed_pair(csv_path, client_id, competitor_id)
             final_md = finalize_markdown(client_p, comp_p)
             st.session_state.last_final_md = final_md
             handled = True
         else:
             # Edit bullet N: <text>
-            import re
-            m = re.match(r"edit bullet\s+(\d+)\s*:\s*(.+)", txt, re.I)
+            m = _EDIT_BULLET_RE.match(txt)
             if m:
                 idx = int(m.group(1)) - 1
                 new_text = m.group(2).strip()
@@ -286,15 +331,12 @@ def main():
             add_bot("I can: `approve`, `edit bullet N: <text>`, `title: <new>`, `description: <new>`")
 
     # Validation + Finalization area
-    packs = load_all_rules("data/policies")
-    rules = select_rules(packs, market=market, categories=[])
+    rules = load_market_rules(market)
     # Light inline revalidation of the draft (against the client SKU context)
     if "last_client_id" not in st.session_state:
         st.session_state.last_client_id = client_id
     try:
-        df = load_csv(csv_path)
-        client_row, _ = select_skus(df, client_id, competitor_id)
-        client_p = preprocess(client_row)
+        client_p, _ = load_preprocessed_pair(csv_path, client_id, competitor_id)
         draft_findings = revalidate_current_draft(client_p, rules)
     except Exception:
         draft_findings = []
@@ -9,7 +9,7 @@ if str(ROOT) not in sys.path:
 
 from src.skill import run_compare, _coerce_list
 from src.rules_engine import validate_with_rules
-from src.rules_registry import load_all_rules, select_rules
+from src.rules_registry import compiled_rules_cached, refresh_rules
 
 BANNER = """\
 CIQ Ally – Competitor Content Intelligence (Chat Demo)
@@ -24,6 +24,7 @@ Commands:
     <one per line>
     (end with a single '.' line)
   validate
+  refresh rules
   approve
   final
   help
@@ -35,42 +36,159 @@ state = {
     "approved": False
 }
 
+def _prompt(text: str) -> str:
+    # stdout is block-buffered (see main); push pending output before blocking on input
+    sys.stdout.flush()
+    return input(text)
+
 def read_multiline():
     print("(Paste bullets, end with a single '.' on its own line)")
     lines = []
     while True:
-        line = input("… ")
+        line = _prompt("… ")
         if line.strip() == ".":
             break
         lines.append(line)
     return lines
 
+# ---- RUN COMPARE ----
+def cmd_compare(line: str):
+    parts = line.split()
+    client_id, competitor_id = parts[1], parts[2]
+    result = run_compare(client_id, competitor_id)
+    state["results"] = result
+    state["approved"] = False
+    sys.stdout.write(
+        "\n--- REPORT ---\n\n"
+        + result["report_markdown"]
+        + "\n\nNext actions: edit bullet, title, description, validate, approve.\n\n"
+    )
+
+# ---- SHOW REPORT ----
+def cmd_show_report(line: str):
+    print(state["results"]["report_markdown"])
+
+# ---- SHOW DRAFT ----
+def cmd_show_draft(line: str):
+    d = state["results"]["draft"]
+    chunks = [f"Title: {d['title']}", "Bullets:"]
+    chunks.extend(f"  {i}. {b}" for i, b in enumerate(d["bullets"], 1))
+    chunks.append(f"Description: {d['description']}")
+    sys.stdout.write("\n".join(chunks) + "\n")
+
+# ---- EDIT BULLET ----
+def cmd_edit_bullet(line: str):
+    # edit bullet N: text
+    try:
+        body = line[len("edit bullet "):]
+        idx_str, text = body.split(":", 1)
+        idx = int(idx_str.strip()) - 1
+        bullets = state["results"]["draft"]["bullets"]
+        while idx >= len(bullets):
+            bullets.append("")
+        bullets[idx] = text.strip()
+        state["results"]["draft"]["bullets"] = bullets
+        print("✅ Bullet updated.")
+    except Exception as e:
+        print(f"Error: {e}")
+
+# ---- EDIT TITLE ----
+def cmd_title(line: str):
+    state["results"]["draft"]["title"] = line.split(":",1)[1].strip()
+    print("✅ Title updated.")
+
+# ---- EDIT DESCRIPTION ----
+def cmd_description(line: str):
+    state["results"]["draft"]["description"] = line.split(":",1)[1].strip()
+    print("✅ Description updated.")
+
+# ---- REPLACE BULLETS ----
+def cmd_bullets(line: str):
+    lines = read_multiline()
+    state["results"]["draft"]["bullets"] = _coerce_list("\n".join(lines))
+    print("✅ Bullets replaced.")
+
+# ---- VALIDATE ----
+def cmd_validate(line: str):
+    rules = compiled_rules_cached(market="AE")
+    draft = state["results"]["draft"]
+
+    # copy client SKU and insert edited draft fields
+    client = state["results"]["client"]
+    client.title = draft["title"]
+    client.bullets = draft["bullets"]
+    client.description = draft["description"]
+
+    failing = [f for f in validate_with_rules(client, rules) if not f.passed]
+    if failing:
+        chunks = [f"❗ {len(failing)} issue(s):"]
+        chunks.extend(f"- {f.rule_id} ({f.section}): {f.message}" for f in failing)
+        sys.stdout.write("\n".join(chunks) + "\n")
+    else:
+        print("✅ Draft passes all policy checks!")
+
+def cmd_refresh_rules(line: str):
+    refresh_rules()
+    print("✅ Policy packs will be reloaded on next use.")
+
+# ---- APPROVE ----
+def cmd_approve(line: str):
+    state["approved"] = True
+    print("✅ Approved. Use `final` to output final Markdown.")
+
+# ---- FINAL MARKDOWN ----
+def cmd_final(line: str):
+    draft = state["results"]["draft"]
+    cid = state["results"]["client"].sku_id
+    chunks = [f"# FINAL – {cid}", "\n## Title\n" + draft["title"], "\n## Bullets"]
+    chunks.extend(f"- {b}" for b in draft["bullets"])
+    chunks.append("\n## Description\n" + draft["description"])
+    sys.stdout.write("\n".join(chunks) + "\n")
+
+def cmd_help(line: str):
+    print(BANNER)
+
+# Whole-line commands (matched case-insensitively) and prefix commands.
+COMMANDS = {
+    "show report": cmd_show_report,
+    "show draft": cmd_show_draft,
+    "bullets:": cmd_bullets,
+    "validate": cmd_validate,
+    "refresh rules": cmd_refresh_rules,
+    "approve": cmd_approve,
+    "final": cmd_final,
+    "help": cmd_help,
+}
+PREFIX_COMMANDS = (
+    ("edit bullet ", cmd_edit_bullet),
+    ("title:", cmd_title),
+    ("description:", cmd_description),
+)
+# Longer than any command name, so exact matches on the head are exact matches on the line.
+_HEAD = 16
+
 def main():
+    # Reports are long; batch writes instead of a syscall per printed line.
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(line_buffering=False)
     print(BANNER)
 
     while True:
         try:
-            line = input("ally> ").strip()
+            line = _prompt("ally> ").strip()
         except EOFError:
             break
         if not line:
             continue
 
-        low = line.lower()
+        # Only the head is needed for dispatch; don't lowercase long pasted text.
+        low = line[:_HEAD].lower()
 
         if low in ("quit", "exit"):
             break
 
-        # ---- RUN COMPARE ----
         if low.startswith("compare "):
-            parts = line.split()
-            client_id, competitor_id = parts[1], parts[2]
-            result = run_compare(client_id, competitor_id)
-            state["results"] = result
-            state["approved"] = False
-            print("\n--- REPORT ---\n")
-            print(result["report_markdown"])
-            print("\nNext actions: edit bullet, title, description, validate, approve.\n")
+            cmd_compare(line)
             continue
 
         # If no comparison was run yet:
@@ -78,101 +196,16 @@ def main():
             print("Run `compare <client> <competitor>` first.")
             continue
 
-        # ---- SHOW REPORT ----
-        if low == "show report":
-            print(state["results"]["report_markdown"])
-            continue
-
-        # ---- SHOW DRAFT ----
-        if low == "show draft":
-            d = state["results"]["draft"]
-            print(f"Title: {d['title']}")
-            print("Bullets:")
-            for i, b in enumerate(d["bullets"], 1):
-                print(f"  {i}. {b}")
-            print("Description:", d["description"])
-            continue
-
-        # ---- EDIT BULLET ----
-        if low.startswith("edit bullet "):
-            # edit bullet N: text
-            try:
-                body = line[len("edit bullet "):]
-                idx_str, text = body.split(":", 1)
-                idx = int(idx_str.strip()) - 1
-                bullets = state["results"]["draft"]["bullets"]
-                while idx >= len(bullets):
-                    bullets.append("")
-                bullets[idx] = text.strip()
-                state["results"]["draft"]["bullets"] = bullets
-                print("✅ Bullet updated.")
-            except Exception as e:
-                print(f"Error: {e}")
-            continue
-
-        # ---- EDIT TITLE ----
-        if low.startswith("title:"):
-            state["results"]["draft"]["title"] = line.split(":",1)[1].strip()
-            print("✅ Title updated.")
-            continue
-
-        # ---- EDIT DESCRIPTION ----
-        if low.startswith("description:"):
-            state["results"]["draft"]["description"] = line.split(":",1)[1].strip()
-            print("✅ Description updated.")
-            continue
-
-        # ---- REPLACE BULLETS ----
-        if low == "bullets:":
-            lines = read_multiline()
-            state["results"]["draft"]["bullets"] = _coerce_list("\n".join(lines))
-            print("✅ Bullets replaced.")
-            continue
-
-        # ---- VALIDATE ----
-        if low == "validate":
-            packs = load_all_rules("data/policies")
-            rules = select_rules(packs, market="AE", categories=[])
-            draft = state["results"]["draft"]
-
-            # copy client SKU and insert edited draft fields
-            client = state["results"]["client"]
-            client.title = draft["title"]
-            client.bullets = draft["bullets"]
-            client.description = draft["description"]
-
-            failing = [f for f in validate_with_rules(client, rules) if not f.passed]
-            if failing:
-                print(f"❗ {len(failing)} issue(s):")
-                for f in failing:
-                    print(f"- {f.rule_id} ({f.section}): {f.message}")
-            else:
-                print("✅ Draft passes all policy checks!")
-            continue
-
-        # ---- APPROVE ----
-        if low == "approve":
-            state["approved"] = True
-            print("✅ Approved. Use `final` to output final Markdown.")
-            continue
-
-        # ---- FINAL MARKDOWN ----
-        if low == "final":
-            draft = state["results"]["draft"]
-            cid = state["results"]["client"].sku_id
-            print(f"# FINAL – {cid}")
-            print("\n## Title\n" + draft["title"])
-            print("\n## Bullets")
-            for b in draft["bullets"]:
-                print(f"- {b}")
-            print("\n## Description\n" + draft["description"])
+        handler = COMMANDS.get(low)
+        if handler is None:
+            for prefix, fn in PREFIX_COMMANDS:
+                if low.startswith(prefix):
+                    handler = fn
+                    break
+        if handler is None:
+            print("Unknown command. Type `help`.")
             continue
-
-        if low == "help":
-            print(BANNER)
-            continue
-
-        print("Unknown command. Type `help`.")
+        handler(line)
 
 if __name__ == "__main__":
     main()
@@ -1,47 +1,63 @@
 # src/compare.py
-from typing import List, Optional
+from typing import Dict, List, Optional
 from .models import SKU, SectionScores, ComparisonRow, Finding
 
 def _fmt(v):
     return "n/a" if v is None else v
 
+_NUMERIC = (int, float)
+
 def _rows_for_section(section: str, cs: SectionScores, ks: SectionScores) -> List[ComparisonRow]:
+    k_get = ks.metrics.get
     rows: List[ComparisonRow] = []
     for m, v in cs.metrics.items():
-        kv = ks.metrics.get(m)
-        gap = (v - kv) if isinstance(v, (int, float)) and isinstance(kv, (int, float)) else "-"
+        kv = k_get(m)
+        gap = (v - kv) if isinstance(v, _NUMERIC) and isinstance(kv, _NUMERIC) else "-"
         rows.append(ComparisonRow(section=section, metric=m, client=_fmt(v), competitor=_fmt(kv), gap=gap))
     return rows
 
 # -------- Policy aggregation helpers --------
 
-def _policy_counts(findings: List[Finding], section: Optional[str] = None):
-    fs = [f for f in findings if (section is None or f.section == section)]
-    total = len(fs)
-    errors = sum(1 for f in fs if (not f.passed) and getattr(f, "severity", "warning") == "error")
-    warnings = sum(1 for f in fs if (not f.passed) and getattr(f, "severity", "warning") != "error")
+def _policy_buckets(findings: List[Finding]) -> Dict[Optional[str], List[int]]:
+    """One pass: {section: [total, errors, warnings]}, with key None holding the overall counts."""
+    buckets: Dict[Optional[str], List[int]] = {None: [0, 0, 0]}
+    overall = buckets[None]
+    for f in findings:
+        b = buckets.get(f.section)
+        if b is None:
+            b = buckets[f.section] = [0, 0, 0]
+        b[0] += 1
+        overall[0] += 1
+        if not f.passed:
+            slot = 1 if f.severity == "error" else 2
+            b[slot] += 1
+            overall[slot] += 1
+    return buckets
+
+def _policy_counts(buckets: Dict[Optional[str], List[int]], section: Optional[str] = None):
+    total, errors, warnings = buckets.get(section) or (0, 0, 0)
     return total, errors, warnings
 
-def _policy_rows(tag: str, client_find: List[Finding], comp_find: List[Finding]) -> List[ComparisonRow]:
+def _policy_rows(tag: str, client_buckets: dict, comp_buckets: dict) -> List[ComparisonRow]:
     rows: List[ComparisonRow] = []
-    ct, ce, cw = _policy_counts(client_find)
-    kt, ke, kw = _policy_counts(comp_find)
+    ct, ce, cw = _policy_counts(client_buckets)
+    kt, ke, kw = _policy_counts(comp_buckets)
     rows.append(ComparisonRow(section=f'policy:{tag}', metric='rules_total', client=ct, competitor=kt, gap='-'))
     rows.append(ComparisonRow(section=f'policy:{tag}', metric='errors',      client=ce, competitor=ke, gap=ce-ke))
     rows.append(ComparisonRow(section=f'policy:{tag}', metric='warnings',    client=cw, competitor=kw, gap=cw-kw))
     return rows
 
-def _policy_rows_per_section(client_find: List[Finding], comp_find: List[Finding]) -> List[ComparisonRow]:
+def _policy_rows_per_section(client_buckets: dict, comp_buckets: dict) -> List[ComparisonRow]:
     rows: List[ComparisonRow] = []
     for sec in ['title', 'bullets', 'description']:
-        ct, ce, cw = _policy_counts(client_find, sec)
-        kt, ke, kw = _policy_counts(comp_find, sec)
+        ct, ce, cw = _policy_counts(client_buckets, sec)
+        kt, ke, kw = _policy_counts(comp_buckets, sec)
         rows.append(ComparisonRow(section=f'policy:{sec}', metric='errors',   client=ce, competitor=ke, gap=ce-ke))
         rows.append(ComparisonRow(section=f'policy:{sec}', metric='warnings', client=cw, competitor=kw, gap=cw-kw))
     return rows
 
 def _failed_ids(findings: List[Finding]) -> List[str]:
-    return [getattr(f, "rule_id", "") for f in findings if not getattr(f, "passed", True)]
+    return [f.rule_id for f in findings if not f.passed]
 
 def _compact_rules(ids: List[str], n: int = 3) -> str:
     if not ids:
@@ -75,8 +91,10 @@ def compare_sections(client: SKU, comp: SKU,
         gap='-'
     ))
 
-    # Policy overview (overall + per-section)
-    table.extend(_policy_rows('overall', client_findings, comp_findings))
-    table.extend(_policy_rows_per_section(client_findings, comp_findings))
+    # Policy overview (overall + per-section), from one pass over each side's findings
+    client_buckets = _policy_buckets(client_findings)
+    comp_buckets   = _policy_buckets(comp_findings)
+    table.extend(_policy_rows('overall', client_buckets, comp_buckets))
+    table.extend(_policy_rows_per_section(client_buckets, comp_buckets))
 
     return table
@@ -0,0 +1,42 @@
+"""
+Pull the JSON array out of a free-form LLM reply.
+
+Models often wrap the array in prose or code fences, so callers decode
+straight from a '[' that starts a valid array with JSONDecoder.raw_decode,
+which stops at the array's end and ignores whatever commentary follows.
+
+Both callers expect an array of objects (rules, suggestions). A '[' that
+sits in a JSON value position (after ':', ',' or '[') belongs to some
+enclosing structure and is never a candidate, and a decoded list whose
+items aren't all objects is skipped. Together these keep a truncated or
+malformed outer array from yielding one of its nested lists (a rule's
+scope.market, a suggestion's references); the result is None instead.
+"""
+import json
+from typing import Any, Dict, List, Optional
+
+_DECODER = json.JSONDecoder()
+_VALUE_PREFIX = ":,["
+
+
+def _in_value_position(text: str, pos: int) -> bool:
+    i = pos - 1
+    while i >= 0 and text[i].isspace():
+        i -= 1
+    return i >= 0 and text[i] in _VALUE_PREFIX
+
+
+def decode_json_array(text: str) -> Optional[List[Dict[str, Any]]]:
+    """The first JSON array of objects embedded in text, or None if there is none."""
+    start = text.find("[")
+    while start != -1:
+        if not _in_value_position(text, start):
+            try:
+                obj, _ = _DECODER.raw_decode(text, start)
+            except json.JSONDecodeError:
+                pass
+            else:
+                if isinstance(obj, list) and all(isinstance(item, dict) for item in obj):
+                    return obj
+        start = text.find("[", start + 1)
+    return None
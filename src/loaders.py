@@ -1,7 +1,16 @@
+import json
+import os
+import re
 import pandas as pd
-from typing import Tuple, List, Optional
+from functools import lru_cache
+from typing import Dict, Iterator, Mapping, Tuple, List, Optional
 from .models import SKU
 
+# Common separators in retailer exports, in priority order: the first one
+# present wins, so a "||" list with ";" inside a bullet is not split on ";".
+BULLET_SEPARATORS = ("||", "|", "\n", "•", ";", "‣", "·", "—")
+_ANY_BULLET_SEP = re.compile("|".join(re.escape(sep) for sep in BULLET_SEPARATORS))
+
 # Map your exact columns (+ keep generic fallbacks for safety)
 ID_ALIASES       = ["product_id", "sku_id", "sku", "asin", "id"]
 TITLE_ALIASES    = ["title", "product_title", "name"]
@@ -11,9 +20,28 @@ BRAND_ALIASES    = ["retailer_brand_name", "brand", "brand_name", "manufacturer"
 CATEGORY_ALIASES = ["retailer_category_node", "universe", "category", "dept", "vertical"]
 IMG_ALIASES      = ["image_url", "image_urls", "images", "image_links"]
 
+ALIAS_GROUPS = {
+    "id": ID_ALIASES,
+    "title": TITLE_ALIASES,
+    "bullets": BULLET_ALIASES,
+    "description": DESC_ALIASES,
+    "brand": BRAND_ALIASES,
+    "category": CATEGORY_ALIASES,
+    "images": IMG_ALIASES,
+}
+
 def load_csv(path: str) -> pd.DataFrame:
     return pd.read_csv(path)
 
+@lru_cache(maxsize=8)
+def _load_indexed_csv_at(path: str, mtime_ns: int) -> Tuple[pd.DataFrame, Dict[str, int]]:
+    df = load_csv(path)
+    return df, build_sku_index(df)
+
+def load_indexed_csv(path: str) -> Tuple[pd.DataFrame, Dict[str, int]]:
+    """(frame, sku id -> row position) memoized per file mtime. Both are shared: treat as read-only."""
+    return _load_indexed_csv_at(os.path.abspath(path), os.stat(path).st_mtime_ns)
+
 def _first_col(df: pd.DataFrame, candidates: List[str]) -> Optional[str]:
     for c in candidates:
         if c in df.columns:
@@ -36,62 +64,106 @@ def _split_bullets(raw) -> List[str]:
     if not s:
         return []
     # JSON-ish list
-    if s.startswith("[") and s.endswith("]"):
+    if s[0] == "[" and s[-1] == "]":
         try:
-            import json
             arr = json.loads(s)
             return [str(x).strip() for x in (arr or []) if str(x).strip()]
         except Exception:
             pass
-    # Common separators in retailer exports
-    for sep in ["||", "|", "\n", "•", ";", "‣", "·", "—"]:
-        if sep in s:
-            return [b.strip(" -•\t") for b in s.split(sep) if b.strip(" -•\t")]
+    # One scan to rule out the common single-bullet case before trying each separator
+    if _ANY_BULLET_SEP.search(s):
+        for sep in BULLET_SEPARATORS:
+            if sep in s:
+                return [b for part in s.split(sep) if (b := part.strip(" -•\t"))]
     # Fallback: single bullet
     return [s]
 
-def _text_from_aliases(row: pd.Series, aliases: List[str]) -> str:
+def _cell_text(v) -> str:
+    """Stripped cell text; missing cells (None/NaN/NaT) give '' rather than 'nan'."""
+    if v is None or v is pd.NaT or (isinstance(v, float) and v != v):
+        return ""
+    return str(v).strip()
+
+def _text_from_aliases(row: Mapping[str, object], aliases: List[str]) -> str:
     for c in aliases:
-        if c in row and isinstance(row[c], str) and row[c].strip():
-            return row[c].strip()
+        v = row.get(c)
+        if isinstance(v, str) and (s := v.strip()):
+            return s
     return ""
 
-def _bullets_from_row(row: pd.Series) -> List[str]:
-    for c in BULLET_ALIASES:
-        if c in row and str(row[c]).strip():
-            return _split_bullets(row[c])
+def _bullets_from_row(row: Mapping[str, object], aliases: List[str] = BULLET_ALIASES) -> List[str]:
+    for c in aliases:
+        v = row.get(c)
+        if isinstance(v, list):
+            return _split_bullets(v)
+        if s := _cell_text(v):
+            return _split_bullets(s)
     return []
 
-def _images_from_row(row: pd.Series) -> Optional[List[str]]:
-    for c in IMG_ALIASES:
-        if c in row and str(row[c]).strip():
-            val = str(row[c]).strip()
+def _images_from_row(row: Mapping[str, object], aliases: List[str] = IMG_ALIASES) -> Optional[List[str]]:
+    for c in aliases:
+        if val := _cell_text(row.get(c)):
             if "|" in val:
                 return [u.strip() for u in val.split("|") if u.strip()]
             return [val]
     return None
 
-def row_to_sku(row: pd.Series) -> SKU:
+@lru_cache(maxsize=32)
+def _resolve_cols(columns: Tuple[str, ...]) -> Dict[str, List[str]]:
+    """Per alias group, the aliases actually present in `columns`, in priority order."""
+    present = set(columns)
+    return {group: [c for c in aliases if c in present] for group, aliases in ALIAS_GROUPS.items()}
+
+def _sku_from_record(rec: Dict[str, object], cols: Dict[str, List[str]]) -> SKU:
     # pick the first available id-like col
     sid = ""
-    for c in ID_ALIASES:
-        if c in row and str(row[c]).strip():
-            sid = str(row[c]).strip()
+    for c in cols["id"]:
+        if sid := _cell_text(rec[c]):
             break
     return SKU(
         sku_id=sid,
-        title=_text_from_aliases(row, TITLE_ALIASES),
-        bullets=_bullets_from_row(row),
-        description=_text_from_aliases(row, DESC_ALIASES),
-        brand=_text_from_aliases(row, BRAND_ALIASES) or None,
-        category=_text_from_aliases(row, CATEGORY_ALIASES) or None,
-        image_urls=_images_from_row(row)
+        title=_text_from_aliases(rec, cols["title"]),
+        bullets=_bullets_from_row(rec, cols["bullets"]),
+        description=_text_from_aliases(rec, cols["description"]),
+        brand=_text_from_aliases(rec, cols["brand"]) or None,
+        category=_text_from_aliases(rec, cols["category"]) or None,
+        image_urls=_images_from_row(rec, cols["images"])
     )
 
-def select_skus(df: pd.DataFrame, client_id: str, competitor_id: str) -> Tuple[SKU, SKU]:
+def row_to_sku(row: pd.Series, cols: Optional[Dict[str, List[str]]] = None) -> SKU:
+    if cols is None:
+        cols = _resolve_cols(tuple(row.index))
+    # Plain dict lookups over pre-filtered aliases instead of Series membership tests
+    return _sku_from_record(row.to_dict(), cols)
+
+def iter_skus(df: pd.DataFrame) -> Iterator[SKU]:
+    """Yield one SKU per row, reading only the alias columns via itertuples (no per-row Series)."""
+    cols = _resolve_cols(tuple(df.columns))
+    needed = list(dict.fromkeys(c for group in cols.values() for c in group))
+    for values in df[needed].itertuples(index=False, name=None):
+        yield _sku_from_record(dict(zip(needed, values)), cols)
+
+def build_sku_index(df: pd.DataFrame) -> Dict[str, int]:
+    """Map each id (as str) to the position of its first row, like select_skus' head(1)."""
+    index: Dict[str, int] = {}
+    for pos, sid in enumerate(df[_id_col(df)].astype(str)):
+        index.setdefault(sid, pos)
+    return index
+
+def select_skus(df: pd.DataFrame, client_id: str, competitor_id: str,
+                index: Optional[Dict[str, int]] = None) -> Tuple[SKU, SKU]:
     idcol = _id_col(df)
-    c_row = df[df[idcol].astype(str) == str(client_id)].head(1)
-    k_row = df[df[idcol].astype(str) == str(competitor_id)].head(1)
+    if index is not None:
+        c_pos = index.get(str(client_id))
+        k_pos = index.get(str(competitor_id))
+        if c_pos is None: raise ValueError(f"Client ID '{client_id}' not found in '{idcol}'.")
+        if k_pos is None: raise ValueError(f"Competitor ID '{competitor_id}' not found in '{idcol}'.")
+        client, competitor = iter_skus(df.iloc[[c_pos, k_pos]])
+        return client, competitor
+    ids = df[idcol].astype(str)
+    c_row = df[ids == str(client_id)].head(1)
+    k_row = df[ids == str(competitor_id)].head(1)
     if c_row.empty: raise ValueError(f"Client ID '{client_id}' not found in '{idcol}'.")
     if k_row.empty: raise ValueError(f"Competitor ID '{competitor_id}' not found in '{idcol}'.")
-    return row_to_sku(c_row.iloc[0]), row_to_sku(k_row.iloc[0])
+    client, competitor = iter_skus(pd.concat([c_row, k_row]))
+    return client, competitor
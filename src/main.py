@@ -1,15 +1,12 @@
 import argparse, os
 from .loaders import load_csv, select_skus
-from .preprocess import preprocess
-from .rules import validate_all
+from .preprocess import preprocess_many
 from .scoring import score_all
 from .compare import compare_sections
 from .recommender import suggest_edits_llm
 from .render import render_markdown_report
 from .approvals import ask_approval
-from src.rules_registry import load_all_rules, select_rules
-from src.rules_engine import validate_with_rules
-from .rules_registry import load_all_rules, select_rules
+from .rules_registry import compiled_rules_cached
 from .rules_engine import validate_with_rules
 
 
@@ -32,23 +29,18 @@ def main():
     df = load_csv(args.csv)
     client, competitor = select_skus(df, args.client_id, args.competitor_id)
 
-    client_p = preprocess(client)
-    comp_p   = preprocess(competitor)
+    client_p, comp_p = preprocess_many((client, competitor))
 
-    packs = load_all_rules("data/policies")  # scans all policy folders
     # keep it simple for now; later make these CLI args
     market = "AE"
     categories = [client_p.category or "PetSupplies"]
 
-    rules = select_rules(packs, market="AE", categories=[])  # accept all categories
+    rules = compiled_rules_cached(market="AE", categories=[])  # scans all policy folders; accept all categories
 
     client_find = validate_with_rules(client_p, rules)
     comp_find   = validate_with_rules(comp_p, rules)
     print("findings:", len(client_find), len(comp_find))  # quick sanity log
 
-    client_find = validate_all(client_p)
-    comp_find   = validate_all(comp_p)
-
     client_scores = score_all(client_p)
     comp_scores   = score_all(comp_p)
 
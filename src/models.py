@@ -13,13 +13,14 @@ class SKU:
     category: Optional[str] = None
     image_urls: Optional[List[str]] = None
 
-@dataclass
+@dataclass(slots=True)
 class Finding:
     section: str                 # 'title' | 'bullets' | 'description'
     rule_id: str                 # e.g., 'TITLE_LENGTH'
     passed: bool
     message: str
     citation: Optional[str] = None
+    severity: str = "warning"    # copied from the rule: info | warning | error
 
 @dataclass
 class SectionScores:
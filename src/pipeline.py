@@ -2,11 +2,11 @@
 
 from __future__ import annotations
 from typing import List, Dict, Any
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 
-from src.loaders import load_csv, select_skus
-from src.preprocess import preprocess
-from src.rules_registry import load_all_rules, select_rules
+from src.loaders import load_indexed_csv, select_skus
+from src.preprocess import preprocess_cached
+from src.rules_registry import compiled_rules_cached, styleguide_refs_cached
 from src.rules_engine import validate_with_rules
 from src.scoring import score_all
 from src.compare import compare_sections
@@ -14,6 +14,8 @@ from src.recommender import suggest_edits_llm
 from src.render import render_markdown_report
 from src.models import SKU, Recommendation
 
+_REC_PARAMS = frozenset(f.name for f in fields(Recommendation))
+
 # ---------- helpers (self-contained) ----------
 
 def _get_attr(o, *names, default=None):
@@ -137,14 +139,16 @@ def build_rule_based_suggestions(client: SKU, competitor: SKU, client_findings,
     return suggestions[:top_n]
 
 def _to_rec_obj(r: Dict[str, Any]) -> Recommendation:
-    return Recommendation(
-        section=r.get("section") or "unknown",
-        title=r.get("title") or "Suggestion",
-        before=r.get("before") or "",
-        after=r.get("after") or "",
-        rationale=r.get("rationale") or "",
-        references=r.get("references") or [],
-    )
+    values = {
+        "section": r.get("section") or "unknown",
+        "title": r.get("title") or "Suggestion",
+        "before": r.get("before") or "",
+        "after": r.get("after") or "",
+        "rationale": r.get("rationale") or "",
+        "references": r.get("references") or [],
+    }
+    # Only the fields models.Recommendation declares (it has no 'section')
+    return Recommendation(**{k: v for k, v in values.items() if k in _REC_PARAMS})
 
 # ---------- FINAL compare orchestration ----------
 
@@ -164,13 +168,12 @@ def run_compare(client_id: str,
       }
     """
     # 1) Load + preprocess
-    df = load_csv(csv_path)
-    c_row, k_row = select_skus(df, client_id, competitor_id)
-    client_p, comp_p = preprocess(c_row), preprocess(k_row)
+    df, sku_index = load_indexed_csv(csv_path)
+    c_row, k_row = select_skus(df, client_id, competitor_id, index=sku_index)
+    client_p, comp_p = preprocess_cached(c_row), preprocess_cached(k_row)
 
     # 2) Rules (apply to all categories for now)
-    packs = load_all_rules("data/policies")
-    rules = select_rules(packs, market=market, categories=[])
+    rules = compiled_rules_cached(market)
 
     # 3) Validate
     client_find = validate_with_rules(client_p, rules)
@@ -181,7 +184,7 @@ def run_compare(client_id: str,
     comparison = compare_sections(client_p, comp_p, c_scores, k_scores, client_find, comp_find)
 
     # 5) Suggestions (LLM → normalize → fallback → enforce exactly 3)
-    styleguide_refs = [f"{r.get('policy_id','')}:{r['id']} – {r.get('message','')}".strip(": ") for r in rules]
+    styleguide_refs = styleguide_refs_cached(market)
     recs_raw = suggest_edits_llm(client_p, comp_p, comparison, styleguide_refs)
     recs_norm = normalize_recs(recs_raw)
     recs_norm = [r for r in recs_norm if r.get("after")]  # drop empties
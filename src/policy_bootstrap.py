@@ -9,17 +9,25 @@ import re
 import yaml
 from pathlib import Path
 
+try:
+    from yaml import CSafeDumper as _Dumper  # libyaml emitter
+except ImportError:  # pragma: no cover - PyYAML built without libyaml
+    from yaml import SafeDumper as _Dumper
+
 try:
     import fitz  # PyMuPDF
 except Exception:  # pragma: no cover - optional dependency
     fitz = None
 
+# Plain-text extraction without ligature preservation (ligatures are expanded to letters)
+_TEXT_FLAGS = (fitz.TEXTFLAGS_TEXT & ~fitz.TEXT_PRESERVE_LIGATURES) if fitz else 0
+
 
 def extract_text(pdf_path: str) -> str:
     if not fitz:
         raise RuntimeError("PyMuPDF (fitz) is required to parse the policy PDF.")
-    doc = fitz.open(pdf_path)
-    return "\n".join(page.get_text("text") for page in doc)
+    with fitz.open(pdf_path) as doc:
+        return "\n".join(page.get_text("text", flags=_TEXT_FLAGS) for page in doc)
 
 
 DEFAULT_SCOPE = {
@@ -118,11 +126,18 @@ RULE_PATTERNS = [
 ]
 
 
+# Compiled once at import; guess_rules walks these instead of re-resolving each pattern
+_COMPILED_PATTERNS = [
+    (re.compile(entry["pattern"], entry.get("flags", 0)), entry["rules"])
+    for entry in RULE_PATTERNS
+]
+
+
 def guess_rules(text: str) -> list[dict]:
     matches: dict[str, dict] = {}
-    for entry in RULE_PATTERNS:
-        if re.search(entry["pattern"], text, entry.get("flags", 0)):
-            for rule_tpl in entry["rules"]:
+    for pattern, rule_tpls in _COMPILED_PATTERNS:
+        if pattern.search(text):
+            for rule_tpl in rule_tpls:
                 # clone template so we can attach scope without mutating base
                 rule = dict(rule_tpl)
                 rule["scope"] = dict(DEFAULT_SCOPE)
@@ -145,7 +160,7 @@ def main():
         },
         "rules": rules or [],
     }
-    out.write_text(yaml.safe_dump(doc, sort_keys=False), encoding="utf-8")
+    out.write_text(yaml.dump(doc, Dumper=_Dumper, sort_keys=False), encoding="utf-8")
     print(f"Wrote {out} with {len(rules)} rule(s).")
 
 
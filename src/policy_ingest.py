@@ -1,17 +1,20 @@
 # src/policy_ingest.py
 import json, re, fitz  # PyMuPDF
 from pathlib import Path
+from typing import Iterable, Iterator
 
-def extract_text_blocks(pdf_path: str) -> list[str]:
-    doc = fitz.open(pdf_path)
-    blocks = []
-    for p in doc:
-        text = p.get_text("text")
-        if text and text.strip():
-            blocks.append(text)
-    return blocks
+# Plain-text extraction without ligature preservation (ligatures are expanded to letters)
+_TEXT_FLAGS = fitz.TEXTFLAGS_TEXT & ~fitz.TEXT_PRESERVE_LIGATURES
 
-def segment_sections(blocks: list[str]) -> dict:
+def extract_text_blocks(pdf_path: str) -> Iterator[str]:
+    """Yield non-blank page texts one at a time; the document is closed once exhausted."""
+    with fitz.open(pdf_path) as doc:
+        for p in doc:
+            text = p.get_text("text", flags=_TEXT_FLAGS)
+            if text and text.strip():
+                yield text
+
+def segment_sections(blocks: Iterable[str]) -> dict:
     text = "\n".join(blocks)
     def sect(name): 
         return re.split(rf"\n(?=^[A-Z][A-Za-z ]*?$)", text, flags=re.M)[0]
@@ -12,17 +12,29 @@ import json
 import os
 import re
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, asdict
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 import yaml
 
+from src.llm_json import decode_json_array
+
+try:
+    from yaml import CSafeDumper as _Dumper  # libyaml emitter
+except ImportError:  # pragma: no cover - PyYAML built without libyaml
+    from yaml import SafeDumper as _Dumper
+
 try:
     import fitz  # PyMuPDF
 except Exception:  # pragma: no cover - optional dependency
     fitz = None
 
+# Plain-text extraction without ligature preservation (ligatures are expanded to letters)
+_TEXT_FLAGS = (fitz.TEXTFLAGS_TEXT & ~fitz.TEXT_PRESERVE_LIGATURES) if fitz else 0
+
 try:
     import google.generativeai as genai
 except Exception:  # pragma: no cover - allow offline dev
@@ -34,6 +46,7 @@ PROMPTS_DIR = ROOT / "prompts"
 
 SYSTEM_PROMPT_PATH = PROMPTS_DIR / "policy_rules_system_prompt.md"
 USER_PROMPT_PATH = PROMPTS_DIR / "policy_rules_user_prompt.md"
+BATCH_USER_PROMPT_PATH = PROMPTS_DIR / "policy_rules_batch_user_prompt.md"
 
 KNOWN_SECTIONS = {"title", "bullets", "description", "images"}
 ALLOWED_SECTIONS = {"title", "bullets", "description"}
@@ -76,41 +89,38 @@ class Rule:
 def read_text(pdf_path: Path) -> str:
     if not fitz:
         raise RuntimeError("PyMuPDF (pymupdf) is required to extract text from the policy PDF.")
-    doc = fitz.open(str(pdf_path))
-    return "\n".join(page.get_text("text") for page in doc)
+    with fitz.open(str(pdf_path)) as doc:
+        return "\n".join(page.get_text("text", flags=_TEXT_FLAGS) for page in doc)
 
 
 def normalize_whitespace(text: str) -> str:
     return re.sub(r"[ \t]+", " ", text.replace("\xa0", " ")).strip()
 
 
+# One alternation in SECTION_ALIASES order, so the first listed alias wins like a startswith() walk.
+# Each alias gets its own group and is mapped back by m.lastindex: IGNORECASE also
+# matches look-alikes such as 'ſ' and the Kelvin sign, so the matched text can't be
+# used as a dict key.
+_HEADING_SECTIONS = list(SECTION_ALIASES.values())
+_HEADING_RE = re.compile(
+    r"^(?:" + "|".join("(" + re.escape(name) + ")" for name in SECTION_ALIASES) + r").*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+
 def split_sections(raw_text: str) -> Dict[str, str]:
     """
     Heuristic splitter that looks for known headings and maps them to rule sections.
     """
-    normalized = normalize_whitespace(raw_text)
-    # Preserve line breaks for heading detection
-    lines = [line.strip() for line in raw_text.splitlines()]
+    # Stripped lines so headings anchor at ^; the heading line itself is dropped
+    text = "\n".join(line.strip() for line in raw_text.splitlines())
+    headings = list(_HEADING_RE.finditer(text))
 
     sections: Dict[str, List[str]] = {}
-    current_section_key: Optional[str] = None
-
-    for line in lines:
-        clean = line.strip()
-        if not clean:
-            continue
-        lower = clean.lower()
-        alias = None
-        for name, section in SECTION_ALIASES.items():
-            if lower.startswith(name):
-                alias = section
-                break
-        if alias:
-            current_section_key = alias
-            sections.setdefault(alias, [])
-            continue
-        if current_section_key:
-            sections[current_section_key].append(clean)
+    for i, m in enumerate(headings):
+        end = headings[i + 1].start() if i + 1 < len(headings) else len(text)
+        lines = sections.setdefault(_HEADING_SECTIONS[m.lastindex - 1], [])
+        lines.extend(line for line in text[m.end():end].split("\n") if line)
 
     return {k: "\n".join(v).strip() for k, v in sections.items() if v}
 
@@ -121,6 +131,7 @@ def load_prompts() -> tuple[str, str]:
     return system_prompt, user_template
 
 
+@lru_cache(maxsize=4)
 def configure_genai(model_id: str) -> Any:
     if not genai:
         raise RuntimeError("google-generativeai is not installed.")
@@ -147,14 +158,13 @@ def call_llm(model: Any, system_prompt: str, user_prompt: str) -> str:
     return "\n".join(parts).strip()
 
 
+def parse_json_array(text: str) -> Optional[List[Dict[str, Any]]]:
+    """The first JSON array of objects in text, or None when there is none or it does not parse."""
+    return decode_json_array(text)
+
+
 def extract_json_array(text: str) -> List[Dict[str, Any]]:
-    match = re.search(r"\[[\s\S]*\]", text)
-    if not match:
-        return []
-    try:
-        return json.loads(match.group(0))
-    except Exception:
-        return []
+    return parse_json_array(text) or []
 
 
 def normalize_section(name: str) -> Optional[str]:
@@ -238,7 +248,15 @@ def rules_to_yaml(rules: List[Rule]) -> Dict[str, Any]:
 
 
 def save_yaml(doc: Dict[str, Any], out_path: Path) -> None:
-    out_path.write_text(yaml.safe_dump(doc, sort_keys=False), encoding="utf-8")
+    out_path.write_text(yaml.dump(doc, Dumper=_Dumper, sort_keys=False), encoding="utf-8")
+
+
+def format_batch_prompt(sections: Dict[str, str]) -> str:
+    template = BATCH_USER_PROMPT_PATH.read_text(encoding="utf-8")
+    sections_text = "\n\n".join(
+        f"## {name.title()}\n\n```\n{text}\n```" for name, text in sections.items()
+    )
+    return template.format(sections_text=sections_text)
 
 
 def extract_rules_from_pdf(pdf_path: Path, model_id: str, dump_dir: Optional[Path] = None) -> List[Rule]:
@@ -251,21 +269,45 @@ def extract_rules_from_pdf(pdf_path: Path, model_id: str, dump_dir: Optional[Pat
     all_rules: List[Rule] = []
     raw_dump: Dict[str, Any] = {}
 
-    for section_name, section_text in sections.items():
-        user_prompt = user_template.format(section_name=section_name.title(), section_text=section_text)
-        response_text = call_llm(model, system_prompt, user_prompt)
-        raw_rules = extract_json_array(response_text)
-        normalized = [
-            normalize_rule(rule, default_scope)
-            for rule in raw_rules
-        ]
-        normalized = [rule for rule in normalized if rule is not None]
-        all_rules.extend(normalized)
-        raw_dump[section_name] = {
-            "prompt": user_prompt,
-            "response": response_text,
-            "parsed": raw_rules,
+    # One round-trip for every section; each rule names its own section
+    batch_prompt = format_batch_prompt(sections)
+    batch_response = call_llm(model, system_prompt, batch_prompt) if sections else "[]"
+    batch_rules = parse_json_array(batch_response)
+    raw_dump["batch"] = {
+        "prompt": batch_prompt,
+        "response": batch_response,
+        "parsed": batch_rules,
+    }
+    if batch_rules is not None:
+        all_rules.extend(
+            rule for rule in (normalize_rule(raw, default_scope) for raw in batch_rules)
+            if rule is not None
+        )
+    else:
+        # Unparseable batch reply: fall back to one call per section, issued concurrently
+        prompts = {
+            name: user_template.format(section_name=name.title(), section_text=section_text)
+            for name, section_text in sections.items()
         }
+        with ThreadPoolExecutor(max_workers=len(prompts)) as pool:
+            futures = {
+                name: pool.submit(call_llm, model, system_prompt, user_prompt)
+                for name, user_prompt in prompts.items()
+            }
+        for section_name, user_prompt in prompts.items():
+            response_text = futures[section_name].result()
+            raw_rules = extract_json_array(response_text)
+            normalized = [
+                normalize_rule(rule, default_scope)
+                for rule in raw_rules
+            ]
+            normalized = [rule for rule in normalized if rule is not None]
+            all_rules.extend(normalized)
+            raw_dump[section_name] = {
+                "prompt": user_prompt,
+                "response": response_text,
+                "parsed": raw_rules,
+            }
 
     if dump_dir:
         dump_dir.mkdir(parents=True, exist_ok=True)
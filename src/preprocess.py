@@ -1,20 +1,67 @@
 import re
+import threading
+from collections import OrderedDict
+from dataclasses import replace
+from functools import lru_cache
+from typing import Iterable, List
 from .models import SKU
 
 WHITESPACE = re.compile(r'\s+')
 
+@lru_cache(maxsize=8192)  # catalogs repeat bullets across SKUs; bounded since descriptions can be long
 def normalize_text(s: str) -> str:
-    s = s.replace('\u00A0', ' ')
-    s = WHITESPACE.sub(' ', s).strip()
-    return s
+    # Same as WHITESPACE.sub(' ', s).strip(): str.split() breaks on exactly the
+    # characters \s matches (NBSP included) and drops leading/trailing runs.
+    return ' '.join(s.split())
 
 def preprocess(sku: SKU) -> SKU:
     return SKU(
         sku_id=sku.sku_id,
         title=normalize_text(sku.title),
-        bullets=[normalize_text(b) for b in sku.bullets],
+        bullets=list(map(normalize_text, sku.bullets)),
         description=normalize_text(sku.description),
         brand=sku.brand,
         category=sku.category,
         image_urls=sku.image_urls
     )
+
+def preprocess_many(skus: Iterable[SKU]) -> List[SKU]:
+    """preprocess() over many SKUs in one comprehension, without a call frame per SKU."""
+    nt = normalize_text
+    return [
+        SKU(
+            sku_id=sku.sku_id,
+            title=nt(sku.title),
+            bullets=list(map(nt, sku.bullets)),
+            description=nt(sku.description),
+            brand=sku.brand,
+            category=sku.category,
+            image_urls=sku.image_urls
+        )
+        for sku in skus
+    ]
+
+_PREPROCESS_CACHE: "OrderedDict[tuple, SKU]" = OrderedDict()
+_PREPROCESS_CACHE_MAX = 128
+_PREPROCESS_LOCK = threading.Lock()  # the API runs compares from a threadpool
+
+def preprocess_cached(sku: SKU) -> SKU:
+    """preprocess() memoized on the SKU's content (LRU, 128 entries).
+
+    Callers edit the returned SKU in place (drafts, chat edits), so every call
+    hands back a copy with its own lists.
+    """
+    key = (sku.sku_id, sku.title, tuple(sku.bullets), sku.description,
+           sku.brand, sku.category, tuple(sku.image_urls) if sku.image_urls is not None else None)
+    with _PREPROCESS_LOCK:
+        hit = _PREPROCESS_CACHE.get(key)
+        if hit is not None:
+            _PREPROCESS_CACHE.move_to_end(key)
+    if hit is None:
+        hit = preprocess(sku)
+        with _PREPROCESS_LOCK:
+            _PREPROCESS_CACHE[key] = hit
+            if len(_PREPROCESS_CACHE) > _PREPROCESS_CACHE_MAX:
+                _PREPROCESS_CACHE.popitem(last=False)
+    return replace(hit, bullets=list(hit.bullets),
+                   image_urls=list(hit.image_urls) if hit.image_urls is not None else None)
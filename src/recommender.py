@@ -1,69 +1,130 @@
 import os, json
-from typing import List
+import logging
+import threading
+from concurrent.futures import Future
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Tuple
+from .llm_json import decode_json_array
 from .models import SKU, ComparisonRow, Recommendation
 from dotenv import load_dotenv
-import google.generativeai as genai 
 
+try:
+    from google.api_core.exceptions import GoogleAPIError
+except ImportError:  # pragma: no cover - Gemini SDK not installed
+    GoogleAPIError = None
 
-def _extract_json_array(text: str):
-    # Be lenient: extract the first [...] JSON array
-    import re, json
-    m = re.search(r"\[.*\]", text, flags=re.S)
-    if not m:
-        return None
-    try:
-        return json.loads(m.group(0))
-    except Exception:
-        return None
+log = logging.getLogger(__name__)
 
-def _llm_suggest_gemini(client: SKU, comp: SKU, comparison: List[ComparisonRow], styleguide_refs: List[str]) -> List[Recommendation]:
+# Failures of the Gemini call itself (API errors incl. auth/quota, network, timeouts)
+# fall back to the deterministic suggestions; anything else is a bug and propagates.
+_LLM_CALL_ERRORS = (OSError,) if GoogleAPIError is None else (GoogleAPIError, OSError)
+
+PROMPTS_DIR = Path(__file__).resolve().parents[1] / "prompts"
+
+
+@lru_cache(maxsize=1)
+def _load_prompts() -> Tuple[str, str]:
+    """(system prompt, user template) for recommendations, read from disk once per process."""
+    return (
+        (PROMPTS_DIR / "recs_system_prompt.md").read_text(encoding="utf-8"),
+        (PROMPTS_DIR / "recs_user_prompt.md").read_text(encoding="utf-8"),
+    )
+
+
+@lru_cache(maxsize=1)
+def _load_env() -> None:
+    """load_dotenv once per process; .env never overrides variables already set."""
     load_dotenv()
-    api_key = os.getenv("GEMINI_API_KEY")
-    model_id = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
-    if not api_key:
-        raise ValueError("GEMINI_API_KEY not set (in environment or .env)")
 
+
+@lru_cache(maxsize=4)
+def _gemini_model(api_key: str, model_id: str):
+    """Configured GenerativeModel, built once per (key, model id)."""
     import google.generativeai as genai
     genai.configure(api_key=api_key)
+    return genai.GenerativeModel(model_id)
 
-    # Optional: sanity check model supports generateContent
-    try:
-        # This call can be expensive; skip in hot path once verified.
-        # models = [m.name for m in genai.list_models() if "generateContent" in m.supported_generation_methods]
-        # print("Gemini models available:", models)
-        pass
-    except Exception:
-        pass
 
-    sys_prompt = open("prompts/recs_system_prompt.md","r",encoding="utf-8").read()
-    user_prompt = open("prompts/recs_user_prompt.md","r",encoding="utf-8").read().format(
+def _bullet_lines(bullets: List[str]) -> str:
+    return "\n".join([f"- {b}" for b in bullets])
+
+
+def _format_user_prompt(template: str, client: SKU, comp: SKU, comparison: List[ComparisonRow], styleguide_refs: List[str]) -> str:
+    return template.format(
         client_title=client.title,
-        client_bullets="\n".join(f"- {b}" for b in client.bullets),
+        client_bullets=_bullet_lines(client.bullets),
         client_desc=client.description,
         comp_title=comp.title,
-        comp_bullets="\n".join(f"- {b}" for b in comp.bullets),
+        comp_bullets=_bullet_lines(comp.bullets),
         comp_desc=comp.description,
-        comparison_rows="\n".join(f"{r.section} | {r.metric} | {r.client} | {r.competitor} | {r.gap}" for r in comparison),
+        comparison_rows="\n".join([f"{r.section} | {r.metric} | {r.client} | {r.competitor} | {r.gap}" for r in comparison]),
         styleguide_refs="\n".join(styleguide_refs)
     )
 
-    # Use the current model id
-    model = genai.GenerativeModel(model_id)
-    # Gemini doesn’t truly have a separate “system” channel in this SDK; prepend it
-    prompt = sys_prompt.strip() + "\n\n" + user_prompt.strip()
 
-    response = model.generate_content(prompt)
+def _response_text(response) -> str:
     # Prefer .text, but if absent, fallback to parts
     if hasattr(response, "text") and response.text:
-        text = response.text.strip()
+        return response.text.strip()
+    # Fallback: stitch parts
+    parts = []
+    for cand in getattr(response, "candidates", []) or []:
+        for part in getattr(cand, "content", {}).parts or []:
+            if getattr(part, "text", None):
+                parts.append(part.text)
+    return "\n".join(parts).strip()
+
+
+# Model calls in flight, keyed by (model id, prompt). The API runs compares from a
+# threadpool, so identical concurrent compares wait on one call instead of each paying for it.
+_INFLIGHT: Dict[Tuple[str, str], Future] = {}
+_INFLIGHT_LOCK = threading.Lock()
+
+
+def _generate_shared(model, model_id: str, prompt: str) -> str:
+    """Reply text for prompt, sharing one generate_content call among concurrent identical requests."""
+    key = (model_id, prompt)
+    with _INFLIGHT_LOCK:
+        pending = _INFLIGHT.get(key)
+        owner = pending is None
+        if owner:
+            pending = _INFLIGHT[key] = Future()
+    if not owner:
+        return pending.result()
+    try:
+        text = _response_text(model.generate_content(prompt))
+    except BaseException as exc:
+        pending.set_exception(exc)
+        raise
     else:
-        # Fallback: stitch parts
-        parts = []
-        for cand in getattr(response, "candidates", []) or []:
-            for part in getattr(cand, "content", {}).parts or []:
-                if getattr(part, "text", None):
-                    parts.append(part.text)
-        text = "\n".join(parts).strip()
+        pending.set_result(text)
+        return text
+    finally:
+        with _INFLIGHT_LOCK:
+            del _INFLIGHT[key]
+
+
+def _extract_json_array(text: str):
+    # Be lenient: extract the first [...] JSON array
+    return decode_json_array(text)
+
+def _llm_suggest_gemini(client: SKU, comp: SKU, comparison: List[ComparisonRow], styleguide_refs: List[str]) -> List[Recommendation]:
+    _load_env()
+    api_key = os.getenv("GEMINI_API_KEY")
+    model_id = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
+    if not api_key:
+        raise ValueError("GEMINI_API_KEY not set (in environment or .env)")
+
+    model = _gemini_model(api_key, model_id)
+
+    sys_prompt, user_template = _load_prompts()
+    user_prompt = _format_user_prompt(user_template, client, comp, comparison, styleguide_refs)
+
+    # Gemini doesn’t truly have a separate “system” channel in this SDK; prepend it
+    prompt = sys_prompt.strip() + "\n\n" + user_prompt.strip()
+
+    text = _generate_shared(model, model_id, prompt)
 
     # Expect our strict JSON array (3 objects); be lenient if needed
     arr = _extract_json_array(text)
@@ -88,67 +149,56 @@ def _llm_suggest_gemini(client: SKU, comp: SKU, comparison: List[ComparisonRow],
         ))
     return recs
 
+@lru_cache(maxsize=1)
 def _llm_available() -> bool:
+    """Checked once per process: the SDK import and key lookup don't change between requests."""
     try:
         from openai import OpenAI  # noqa
         return True if os.getenv('OPENAI_API_KEY') else False
     except Exception:
         return False
 
-def suggest_edits_llm(client: SKU, comp: SKU, comparison: List[ComparisonRow], styleguide_refs: List[str]) -> List[Recommendation]:
-    # Use Gemini by default now
-    try:
-        return _llm_suggest_gemini(client, comp, comparison, styleguide_refs)
-    except Exception as e:
-        # deterministic fallback
-        recs = []
-        if len(client.title) > 200:
-            recs.append(Recommendation(
-                title='Shorten title under 200 chars',
-                before=client.title,
-                after=client.title[:180] + ('…' if len(client.title) > 180 else ''),
-                rationale='Amazon prefers concise titles; improves scanability and search relevance.',
-                references=['Comparison:title.length', 'AE Guide: Titles']
-            ))
-        if len(client.bullets) < 5:
-            old = '\n'.join(f'- {b}' for b in client.bullets)
-            add_count = 5 - len(client.bullets)
-            new_bullets = client.bullets + [f'Add specific feature {i+1}' for i in range(add_count)]
-            recs.append(Recommendation(
-                title='Complete up to 5 specific bullets',
-                before=old,
-                after='\n'.join(f'- {b}' for b in new_bullets),
-                rationale='Up to five concise, specific bullets improve conversion and filterability.',
-                references=['AE Guide: Bullets']
-            ))
-        if not recs:
-            recs.append(Recommendation(
-                title='Tighten description and remove promos/URLs',
-                before=client.description,
-                after=client.description[:380],
-                rationale='Descriptions should be concise, factual, and avoid promotional language or URLs.',
-                references=['AE Guide: Description']
-            ))
-        return recs[:3]
+def _deterministic_fallback(client: SKU) -> List[Recommendation]:
+    """Offline suggestions from simple listing heuristics (no LLM)."""
+    recs = []
+    if len(client.title) > 200:
+        recs.append(Recommendation(
+            title='Shorten title under 200 chars',
+            before=client.title,
+            after=client.title[:180] + ('…' if len(client.title) > 180 else ''),
+            rationale='Amazon prefers concise titles; improves scanability and search relevance.',
+            references=['Comparison:title.length', 'AE Guide: Titles']
+        ))
+    if len(client.bullets) < 5:
+        old = _bullet_lines(client.bullets)
+        add_count = 5 - len(client.bullets)
+        new_bullets = client.bullets + [f'Add specific feature {i+1}' for i in range(add_count)]
+        recs.append(Recommendation(
+            title='Complete up to 5 specific bullets',
+            before=old,
+            after=_bullet_lines(new_bullets),
+            rationale='Up to five concise, specific bullets improve conversion and filterability.',
+            references=['AE Guide: Bullets']
+        ))
+    if not recs:
+        recs.append(Recommendation(
+            title='Tighten description and remove promos/URLs',
+            before=client.description,
+            after=client.description[:380],
+            rationale='Descriptions should be concise, factual, and avoid promotional language or URLs.',
+            references=['AE Guide: Description']
+        ))
+    return recs[:3]
 
 def _llm_suggest(client: SKU, comp: SKU, comparison: List[ComparisonRow], styleguide_refs: List[str]) -> List[Recommendation]:
     from openai import OpenAI
-    load_dotenv()
+    _load_env()
     api_key = os.getenv('OPENAI_API_KEY')
     model = os.getenv('MODEL', 'gpt-4o')
     oai = OpenAI(api_key=api_key)
 
-    sys = open('prompts/recs_system_prompt.md','r',encoding='utf-8').read()
-    user = open('prompts/recs_user_prompt.md','r',encoding='utf-8').read().format(
-        client_title=client.title,
-        client_bullets='\n'.join(f'- {b}' for b in client.bullets),
-        client_desc=client.description,
-        comp_title=comp.title,
-        comp_bullets='\n'.join(f'- {b}' for b in comp.bullets),
-        comp_desc=comp.description,
-        comparison_rows='\n'.join(f"{r.section} | {r.metric} | {r.client} | {r.competitor} | {r.gap}" for r in comparison),
-        styleguide_refs='\n'.join(styleguide_refs)
-    )
+    sys, user_template = _load_prompts()
+    user = _format_user_prompt(user_template, client, comp, comparison, styleguide_refs)
 
     resp = oai.chat.completions.create(model=model, temperature=0.2,
         messages=[{'role':'system','content':sys},{'role':'user','content':user}])
@@ -177,35 +227,10 @@ def _llm_suggest(client: SKU, comp: SKU, comparison: List[ComparisonRow], styleg
 
 def suggest_edits_llm(client: SKU, comp: SKU, comparison: List[ComparisonRow], styleguide_refs: List[str]) -> List[Recommendation]:
     if _llm_available():
-        # return _llm_suggest(client, comp, comparison, styleguide_refs)
-        return _llm_suggest_gemini(client, comp, comparison, styleguide_refs)
-    # deterministic fallback (offline)
-    recs = []
-    if len(client.title) > 200:
-        recs.append(Recommendation(
-            title='Shorten title under 200 chars',
-            before=client.title,
-            after=client.title[:180] + ('…' if len(client.title) > 180 else ''),
-            rationale='Amazon prefers concise titles; improves scanability and search relevance.',
-            references=['Comparison:title.length', 'AE Guide: Titles']
-        ))
-    if len(client.bullets) < 5:
-        old = '\n'.join(f'- {b}' for b in client.bullets)
-        add_count = 5 - len(client.bullets)
-        new_bullets = client.bullets + [f'Add specific feature {i+1}' for i in range(add_count)]
-        recs.append(Recommendation(
-            title='Complete up to 5 specific bullets',
-            before=old,
-            after='\n'.join(f'- {b}' for b in new_bullets),
-            rationale='Up to five concise, specific bullets improve conversion and filterability.',
-            references=['AE Guide: Bullets']
-        ))
-    if not recs:
-        recs.append(Recommendation(
-            title='Tighten description and remove promos/URLs',
-            before=client.description,
-            after=client.description[:380],
-            rationale='Descriptions should be concise, factual, and avoid promotional language or URLs.',
-            references=['AE Guide: Description']
-        ))
-    return recs[:3]
+        try:
+            # return _llm_suggest(client, comp, comparison, styleguide_refs)
+            return _llm_suggest_gemini(client, comp, comparison, styleguide_refs)
+        except _LLM_CALL_ERRORS:
+            log.warning("Gemini suggestion call failed; using deterministic fallback", exc_info=True)
+    # deterministic fallback (offline or LLM failure)
+    return _deterministic_fallback(client)
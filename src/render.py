@@ -1,12 +1,27 @@
 # src/render.py
+from operator import attrgetter
 from typing import List, Any
-from .models import SKU, ComparisonRow
+from .models import SKU, ComparisonRow, Recommendation
+
+_REC_FIELDS = attrgetter("title", "before", "after", "rationale", "references")
 
 def _get_attr(o, name, default=None):
     if isinstance(o, dict):
         return o.get(name, default)
     return getattr(o, name, default)
 
+def _rec_fields(i, rec):
+    """(title, before, after, rationale, references) for a dict or Recommendation-like rec."""
+    if type(rec) is dict:
+        get = rec.get
+        return (get("title", f"Suggestion {i}"), get("before", ""), get("after", ""),
+                get("rationale", ""), get("references", []))
+    if isinstance(rec, Recommendation):
+        return _REC_FIELDS(rec)
+    return (_get_attr(rec, "title", f"Suggestion {i}"), _get_attr(rec, "before", ""),
+            _get_attr(rec, "after", ""), _get_attr(rec, "rationale", ""),
+            _get_attr(rec, "references", []))
+
 def _fmt_block(val):
     if isinstance(val, list):
         return "\n".join(f"- {v}" for v in val)
@@ -17,6 +32,45 @@ def _blockquote(text):
         return ">\n"
     return "> " + text.replace("\n", "\n> ") + "\n"
 
+# Snapshot of raw listing values to confirm correct products
+def _cell(value):
+    text = (value or "").strip() if isinstance(value, str) else str(value or "")
+    if not text:
+        text = "(empty)"
+    # Most cells have neither character; a membership test is cheaper than a no-op replace.
+    if "|" in text:
+        text = text.replace("|", "\\|")
+    if "\n" in text:
+        text = text.replace("\n", "<br>")
+    return text
+
+def _join_bullets(items):
+    if not items:
+        return "(none)"
+    joined = "<br>".join(f"{idx+1}. {item}" for idx, item in enumerate(items))
+    return _cell(joined)
+
+def _findings_table(title, finds) -> str:
+    head = f"### {title}\n| Rule | Section | Passed | Message | Citation |\n|---|---|:--:|---|---|\n"
+    if not finds:
+        return head + "| (none) | - | - | - | - |"
+    # Findings are always models.Finding, so plain attribute loads are safe (and fastest).
+    return head + "\n".join([
+        f"| {f.rule_id} | {f.section} | {'✅' if f.passed else '❌'} | {f.message} | {f.citation} |"
+        for f in finds
+    ])
+
+def _render_rec(i, rec) -> str:
+    title, before, after, rationale, refs = _rec_fields(i, rec)
+    refs = refs or []
+
+    text = f"### {i}. {title}\n**Before**\n{_blockquote(_fmt_block(before))}\n**After**\n{_blockquote(_fmt_block(after))}\n"
+    if rationale:
+        text += f"_Rationale:_ {rationale}\n"
+    if refs:
+        text += "_References:_ " + "; ".join(str(x) for x in refs) + "\n"
+    return text
+
 def render_markdown_report(
     client: SKU,
     competitor: SKU,
@@ -26,89 +80,41 @@ def render_markdown_report(
     client_findings=None,
     competitor_findings=None
 ) -> str:
-    lines = []
-    lines.append(f"# Competitor Content Intelligence: {client.sku_id} vs {competitor.sku_id}")
-    lines.append(f"**Client title:** {client.title or ''}")
-    lines.append(f"**Competitor title:** {competitor.title or ''}\n")
-    lines.append("## Summary")
-    lines.append("Compared title, bullets, and description; flagged compliance gaps.\n")
-
-    # Snapshot of raw listing values to confirm correct products
-    def _cell(value):
-        text = (value or "").strip() if isinstance(value, str) else str(value or "")
-        if not text:
-            text = "(empty)"
-        return text.replace("|", "\\|").replace("\n", "<br>")
-
-    def _join_bullets(items):
-        if not items:
-            return "(none)"
-        joined = "<br>".join(f"{idx+1}. {item}" for idx, item in enumerate(items))
-        return _cell(joined)
-
-    lines.append("## Listing Snapshot")
-    lines.append("| Field | Client | Competitor |")
-    lines.append("|---|---|---|")
-    lines.append(f"| SKU | {_cell(client.sku_id)} | {_cell(competitor.sku_id)} |")
-    lines.append(f"| Title | {_cell(client.title)} | {_cell(competitor.title)} |")
-    lines.append(f"| Brand | {_cell(getattr(client, 'brand', '') or '(unknown)')} | {_cell(getattr(competitor, 'brand', '') or '(unknown)')} |")
-    lines.append(f"| Category | {_cell(getattr(client, 'category', '') or '(unknown)')} | {_cell(getattr(competitor, 'category', '') or '(unknown)')} |")
-    lines.append(f"| Bullet Count | {_cell(len(client.bullets or []))} | {_cell(len(competitor.bullets or []))} |")
-    lines.append(f"| Bullets | {_join_bullets(client.bullets or [])} | {_join_bullets(competitor.bullets or [])} |")
-    lines.append(f"| Description | {_cell(client.description)} | {_cell(competitor.description)} |")
-    lines.append("")
-
-    # Comparison table
-    lines.append("## Comparison Table")
-    lines.append("| Section | Metric | Client | Competitor | Gap |")
-    lines.append("|---|---|---:|---:|---:|")
-    for r in comparison:
-        lines.append(f"| {r.section} | {r.metric} | {r.client} | {r.competitor} | {r.gap} |")
-    lines.append("")
-
-    # Findings tables (optional)
-    def _findings_table(title, finds):
-        lines.append(f"### {title}")
-        lines.append("| Rule | Section | Passed | Message | Citation |")
-        lines.append("|---|---|:--:|---|---|")
-        if not finds:
-            lines.append("| (none) | - | - | - | - |")
-            return
-        for f in finds:
-            passed = "✅" if getattr(f, "passed", False) else "❌"
-            rid = getattr(f, "rule_id", "")
-            sec = getattr(f, "section", "")
-            msg = getattr(f, "message", "")
-            cit = getattr(f, "citation", "")
-            lines.append(f"| {rid} | {sec} | {passed} | {msg} | {cit} |")
-
-    lines.append("## Compliance Findings")
-    _findings_table("Client", client_findings or [])
-    _findings_table("Competitor", competitor_findings or [])
-    lines.append("")
-
-    # Top 3 suggestions
-    lines.append("## Top 3 Suggested Edits (Compliant)")
-    if not recs:
-        lines.append("_No suggestions available._\n")
+    # Only the tables and suggestions vary in length; the skeleton is one template.
+    comparison_rows = "".join([
+        f"\n| {r.section} | {r.metric} | {r.client} | {r.competitor} | {r.gap} |" for r in comparison
+    ])
+    if recs:
+        suggestions = "\n".join([_render_rec(i, rec) for i, rec in enumerate(recs[:3], 1)])
     else:
-        for i, rec in enumerate(recs[:3], 1):
-            title = _get_attr(rec, "title", f"Suggestion {i}")
-            before = _get_attr(rec, "before", "")
-            after  = _get_attr(rec, "after", "")
-            rationale = _get_attr(rec, "rationale", "")
-            refs = _get_attr(rec, "references", []) or []
-
-            lines.append(f"### {i}. {title}")
-            lines.append("**Before**")
-            lines.append(_blockquote(_fmt_block(before)))
-            lines.append("**After**")
-            lines.append(_blockquote(_fmt_block(after)))
-            if rationale:
-                lines.append(f"_Rationale:_ {rationale}")
-            if refs:
-                lines.append(f"_References:_ " + "; ".join(str(x) for x in refs))
-            lines.append("")
-
-    lines.append(f"**Approved:** {'Yes' if approved else 'No'}")
-    return "\n".join(lines)   # ← IMPORTANT
+        suggestions = "_No suggestions available._\n"
+
+    return f"""# Competitor Content Intelligence: {client.sku_id} vs {competitor.sku_id}
+**Client title:** {client.title or ''}
+**Competitor title:** {competitor.title or ''}
+
+## Summary
+Compared title, bullets, and description; flagged compliance gaps.
+
+## Listing Snapshot
+| Field | Client | Competitor |
+|---|---|---|
+| SKU | {_cell(client.sku_id)} | {_cell(competitor.sku_id)} |
+| Title | {_cell(client.title)} | {_cell(competitor.title)} |
+| Brand | {_cell(getattr(client, 'brand', '') or '(unknown)')} | {_cell(getattr(competitor, 'brand', '') or '(unknown)')} |
+| Category | {_cell(getattr(client, 'category', '') or '(unknown)')} | {_cell(getattr(competitor, 'category', '') or '(unknown)')} |
+| Bullet Count | {_cell(len(client.bullets or []))} | {_cell(len(competitor.bullets or []))} |
+| Bullets | {_join_bullets(client.bullets or [])} | {_join_bullets(competitor.bullets or [])} |
+| Description | {_cell(client.description)} | {_cell(competitor.description)} |
+
+## Comparison Table
+| Section | Metric | Client | Competitor | Gap |
+|---|---|---:|---:|---:|{comparison_rows}
+
+## Compliance Findings
+{_findings_table("Client", client_findings or [])}
+{_findings_table("Competitor", competitor_findings or [])}
+
+## Top 3 Suggested Edits (Compliant)
+{suggestions}
+**Approved:** {'Yes' if approved else 'No'}"""
@@ -5,6 +5,7 @@ from .models import SKU, Finding
 PROMO_WORDS = re.compile(r'\b(sale|free shipping|free delivery|best seller|top seller)\b', re.I)
 ALL_CAPS = re.compile(r'[A-Z]{4,}')
 SYMBOLS = re.compile(r'[!*$?©®™]')
+VAGUE_WORDS = re.compile(r'\b(top seller|best|great quality)\b', re.I)
 
 def check_title_basic(sku: SKU) -> List[Finding]:
     title = sku.title or ''
@@ -58,7 +59,8 @@ def check_bullets(sku: SKU) -> List[Finding]:
             message='Bullets should not end with punctuation.',
             citation='Bullets: sentence fragments; no ending punctuation【9†...†L174-L200】'
         ))
-        vague = any(re.search(r'\b(top seller|best|great quality)\b', b, re.I) for b in bullets)
+        # Newline is a word boundary and no vague term spans one, so one search covers all bullets.
+        vague = VAGUE_WORDS.search('\n'.join(bullets)) is not None
         msgs.append(Finding(
             section='bullets',
             rule_id='BULLETS_SPECIFIC',
@@ -1,11 +1,13 @@
 # src/rules_engine.py
 import re
+import sys
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Callable, Union
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Callable, Tuple, Union
 from .models import SKU, Finding
 
 # ---- Rule model (dicts from YAML are fine; dataclass helps type hints)
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Rule:
     id: str
     section: str                 # title | bullets | description | images
@@ -17,6 +19,10 @@ class Rule:
     policy_id: Optional[str] = None  # set by rules_registry.select_rules()
     scope: Optional[Dict[str, Any]] = None
 
+    def __hash__(self):
+        # params/scope are dicts; the identifying fields are enough (and equal rules agree on them)
+        return hash((self.id, self.section, self.type, self.policy_id))
+
 RuleLike = Union[Rule, Dict[str, Any]]
 
 # ---- Getters for each section
@@ -29,11 +35,22 @@ SECTION_GETTERS: Dict[str, SectionGetter] = {
 }
 
 # ---- Helpers
+@lru_cache(maxsize=None)  # one entry per distinct (pattern, flags) across the loaded packs
 def _rx(pattern: str, flags: str = "") -> re.Pattern:
     f = 0
     if "i" in flags.lower(): f |= re.IGNORECASE
     return re.compile(pattern, f)
 
+_URL_EMAIL_RX = re.compile(r"(https?://|www\.|\S+@\S+)", re.I)
+
+def _intern(value):
+    # Pack strings come from YAML, not the literals compare/render test against; intern them once at compile time.
+    return sys.intern(value) if type(value) is str else value
+
+@lru_cache(maxsize=32)
+def _punct_set(punctuation: str) -> frozenset:
+    return frozenset(punctuation)
+
 # ---- Check implementations
 def check_max_length(value: Any, params: Dict[str, Any]) -> bool:
     if not isinstance(value, str): return True
@@ -59,36 +76,53 @@ def check_min_count(value: Any, params: Dict[str, Any]) -> bool:
         return True
     return len(value) >= int(params["value"])
 
+def _params_rx(params: Dict[str, Any]) -> Optional[re.Pattern]:
+    """The rule's compiled pattern: precompiled by compile_rules, else looked up via _rx."""
+    r = params.get("_rx")
+    if r is None:
+        pattern = params.get("pattern")
+        if not pattern:
+            return None
+        r = _rx(pattern, params.get("flags",""))
+    return r
+
 def check_forbidden_regex(value: Any, params: Dict[str, Any]) -> bool:
     if not isinstance(value, str): return True
-    pattern = params.get("pattern")
-    if not pattern:
+    r = _params_rx(params)
+    if r is None:
         return True
-    return _rx(pattern, params.get("flags","")).search(value) is None
+    return r.search(value) is None
 
 def check_required_regex(value: Any, params: Dict[str, Any]) -> bool:
     if not isinstance(value, str): return True
-    pattern = params.get("pattern")
-    if not pattern:
+    r = _params_rx(params)
+    if r is None:
         return True
-    return _rx(pattern, params.get("flags","")).search(value) is not None
+    return r.search(value) is not None
 
 def check_forbidden_regex_each(value: Any, params: Dict[str, Any]) -> bool:
     if not isinstance(value, list): return True
-    pattern = params.get("pattern")
-    if not pattern:
+    r = _params_rx(params)
+    if r is None:
         return True
-    r = _rx(pattern, params.get("flags",""))
     return all(r.search((v or "")) is None for v in value)
 
 def check_no_ending_punct(value: Any, params: Dict[str, Any]) -> bool:
     if not isinstance(value, list): return True
-    bad = set(list(params.get("punctuation", ".;:!")))
-    return all((not v) or (str(v).rstrip() and str(v).rstrip()[-1] not in bad) for v in value)
+    punct = params.get("punctuation", ".;:!")
+    bad = _punct_set(punct) if isinstance(punct, str) else frozenset(punct)
+    for v in value:
+        if not v:
+            continue
+        text = str(v).rstrip()
+        # Whitespace-only bullets fail, as before
+        if not text or text[-1] in bad:
+            return False
+    return True
 
 def check_no_urls_emails(value: Any, _params: Dict[str, Any]) -> bool:
     if not isinstance(value, str): return True
-    return not re.search(r"(https?://|www\.|\S+@\S+)", value, re.I)
+    return not _URL_EMAIL_RX.search(value)
 
 def check_bullets_capitalized(value: Any, _params: Dict[str, Any]) -> bool:
     """
@@ -114,19 +148,17 @@ _NUMBER_WORDS = {
     "six", "seven", "eight", "nine", "ten", "eleven",
     "twelve"
 }
+# A number word counts only when delimited by spaces or the string ends, as in f" {word} " in f" {text} ".
+_NUMBER_WORDS_RX = re.compile(r"(?<![^ ])(?:" + "|".join(sorted(_NUMBER_WORDS)) + r")(?![^ ])")
 
 def check_bullets_numbers_as_numerals(value: Any, _params: Dict[str, Any]) -> bool:
     """
     Fail if a bullet spells out numbers (e.g., 'five') instead of using numerals.
     """
     if not isinstance(value, list): return True
-    for raw in value:
-        if not raw:
-            continue
-        text = str(raw).lower()
-        if any(f" {word} " in f" {text} " for word in _NUMBER_WORDS):
-            return False
-    return True
+    # Bullets joined by a space keep each bullet's ends as word delimiters.
+    text = " ".join([str(raw) for raw in value if raw]).lower()
+    return _NUMBER_WORDS_RX.search(text) is None
 
 def check_image_constraint(value: Any, params: Dict[str, Any]) -> bool:
     """
@@ -151,66 +183,83 @@ CHECKS: Dict[str, Callable[[Any, Dict[str, Any]], bool]] = {
     "image_constraint": check_image_constraint,
 }
 
+def _dict_to_rule(r: Dict[str, Any]) -> Rule:
+    get = r.get
+    return Rule(r["id"], r["section"], r["type"], get("params", {}), get("severity", "warning"),
+                get("message", ""), get("citation"), get("policy_id"), get("scope"))
+
 def _as_rule(r: RuleLike) -> Rule:
+    # compile_rules() calls this once per rule, so validating many SKUs never rebuilds Rules.
     if isinstance(r, Rule): return r
-    return Rule(
-        id=r["id"],
-        section=r["section"],
-        type=r["type"],
-        params=r.get("params", {}),
-        severity=r.get("severity", "warning"),
-        message=r.get("message", ""),
-        citation=r.get("citation"),
-        policy_id=r.get("policy_id"),
-        scope=r.get("scope"),
-    )
-
-def validate_with_rules(sku, rules: List):  # rules can be dicts or Rule objects
-    """
-    Run all policy rules against a single SKU and return Finding[].
+    return _dict_to_rule(r)
 
-    - Namespaces rule_id as "<policy_id>:<id>" when policy_id is present.
-    - Copies the rule's severity onto the Finding (for aggregation later).
-    - Includes the human-readable rule message (prefixed with policy_id for traceability).
-    """
-    findings: List[Finding] = []
+_REGEX_TYPES = {"forbidden_regex", "required_regex", "forbidden_regex_each"}
 
+# (check_fn, params, section, rule_id, message, citation, severity)
+CompiledRule = Tuple[Callable[[Any, Dict[str, Any]], bool], Dict[str, Any],
+                     str, str, str, Optional[str], str]
+
+class CompiledRules(list):
+    """Output of compile_rules(); validate_with_rules iterates it without per-rule setup."""
+
+    def __init__(self):
+        super().__init__()
+        # Getters for the sections these rules read, so each runs once per SKU
+        self.getters: Dict[str, SectionGetter] = {}
+
+def compile_rules(rules: List) -> CompiledRules:  # rules can be dicts or Rule objects
+    """
+    Resolve each rule once: section getter, check function, compiled regex,
+    namespaced id and display message. Rules with an unknown section or type
+    are dropped, exactly as validate_with_rules skips them.
+    """
+    compiled = CompiledRules()
     for raw in rules:
-        # Normalize to a Rule object (handles dicts from YAML)
         rule = _as_rule(raw)
-
-        # Get section value (title/bullets/description/images)
         getter = SECTION_GETTERS.get(rule.section)
-        if not getter:
-            continue
-        value = getter(sku)
-
-        # Find the check implementation
         check_fn = CHECKS.get(rule.type)
-        if not check_fn:
+        if not getter or not check_fn:
             continue
 
-        # Evaluate
-        passed = check_fn(value, rule.params)
+        params = rule.params
+        if rule.type in _REGEX_TYPES and params.get("pattern"):
+            params = {**params, "_rx": _rx(params["pattern"], params.get("flags", ""))}
 
-        # Build a namespaced rule id and message
+        # Namespaced rule id and message
         namespaced_id = f"{rule.policy_id}:{rule.id}" if rule.policy_id else rule.id
         message = rule.message or rule.id
         if rule.policy_id:
             message = f"{rule.policy_id}:{rule.id} – {message}"
 
-        # Create the finding
-        finding = Finding(
-            section=rule.section,
-            rule_id=namespaced_id,
-            passed=passed,
-            message=message,
-            citation=rule.citation
-        )
+        section = _intern(rule.section)
+        compiled.getters[section] = getter
+        compiled.append((check_fn, params, section, _intern(namespaced_id),
+                         message, rule.citation, _intern(rule.severity)))
+    return compiled
 
-        # Carry severity through so compare/render can aggregate counts
-        setattr(finding, "severity", getattr(rule, "severity", "warning"))
+def validate_with_rules(sku, rules: List):  # dicts, Rule objects, or compile_rules() output
+    """
+    Run all policy rules against a single SKU and return Finding[].
 
-        findings.append(finding)
+    - Namespaces rule_id as "<policy_id>:<id>" when policy_id is present.
+    - Copies the rule's severity onto the Finding (for aggregation later).
+    - Includes the human-readable rule message (prefixed with policy_id for traceability).
 
-    return findings
+    Pass compile_rules(rules) when validating many SKUs against the same rules.
+    """
+    if not isinstance(rules, CompiledRules):
+        rules = compile_rules(rules)
+
+    values = {section: getter(sku) for section, getter in rules.getters.items()}
+    return [
+        Finding(
+            section=section,
+            rule_id=rule_id,
+            passed=check_fn(values[section], params),
+            message=message,
+            citation=citation,
+            # Carry severity through so compare/render can aggregate counts
+            severity=severity,
+        )
+        for check_fn, params, section, rule_id, message, citation, severity in rules
+    ]
@@ -1,10 +1,19 @@
+import os
+from functools import lru_cache
 from pathlib import Path
+from typing import Optional
 import yaml
+from .rules_engine import compile_rules
+
+try:
+    from yaml import CSafeLoader as _Loader  # libyaml parser
+except ImportError:  # pragma: no cover - PyYAML built without libyaml
+    from yaml import SafeLoader as _Loader
 
 def _safe_load(path: Path):
     if not path.exists(): return None
     try:
-        return yaml.safe_load(path.read_text(encoding="utf-8")) or {}
+        return yaml.load(path.read_text(encoding="utf-8"), Loader=_Loader) or {}
     except Exception:
         return {}
 
@@ -40,33 +49,115 @@ def load_all_rules(root="data/policies"):
         packs.append({"meta": meta, "rules": rules})
     return packs
 
+def _stat_key(entry: os.DirEntry, prefix: str = "") -> tuple:
+    st = entry.stat()
+    return (prefix + entry.name, st.st_mtime_ns, st.st_size)
+
+def policies_fingerprint(root="data/policies") -> tuple:
+    """(path, mtime_ns, size) for the policy root, its entries and each pack's files.
+
+    Adding, deleting or replacing any pack file changes the tuple, even when the
+    file touched isn't the newest one.
+    """
+    st = os.stat(root)
+    keys = [("", st.st_mtime_ns, st.st_size)]
+    with os.scandir(root) as entries:
+        for entry in entries:
+            keys.append(_stat_key(entry))
+            if not entry.is_dir():
+                continue
+            with os.scandir(entry.path) as files:
+                keys.extend(_stat_key(f, entry.name + "/") for f in files)
+    return tuple(sorted(keys))
+
+@lru_cache(maxsize=8)
+def _load_all_rules_at(root: str, fingerprint: tuple):
+    return load_all_rules(root)
+
+def load_all_rules_cached(root="data/policies", fingerprint: Optional[tuple] = None):
+    """load_all_rules memoized per policy tree fingerprint. Packs are shared: don't mutate them."""
+    if fingerprint is None:
+        fingerprint = policies_fingerprint(root)
+    return _load_all_rules_at(os.path.abspath(root), fingerprint)
+
+@lru_cache(maxsize=32)
+def _select_rules_at(root: str, fingerprint: tuple, market: str, categories: tuple):
+    return select_rules(_load_all_rules_at(root, fingerprint), market=market, categories=list(categories))
+
+def select_rules_cached(market: str, categories=(), root="data/policies"):
+    """select_rules over the cached packs, memoized per policy tree fingerprint. The list is shared: don't mutate it."""
+    return _select_rules_at(os.path.abspath(root), policies_fingerprint(root), market, tuple(categories))
+
+@lru_cache(maxsize=32)
+def _compiled_rules_at(root: str, fingerprint: tuple, market: str, categories: tuple):
+    return compile_rules(_select_rules_at(root, fingerprint, market, categories))
+
+def compiled_rules_cached(market: str, categories=(), root="data/policies"):
+    """compile_rules() of the select_rules_cached selection, built once per policy tree fingerprint."""
+    return _compiled_rules_at(os.path.abspath(root), policies_fingerprint(root), market, tuple(categories))
+
+def styleguide_refs(rules) -> tuple[str, ...]:
+    """'policy_id:rule_id – message' lines handed to the recommender as style guide references."""
+    return tuple(f"{r.get('policy_id','')}:{r['id']} – {r.get('message','')}".strip(": ") for r in rules)
+
+@lru_cache(maxsize=32)
+def _styleguide_refs_at(root: str, fingerprint: tuple, market: str, categories: tuple):
+    return styleguide_refs(_select_rules_at(root, fingerprint, market, categories))
+
+def styleguide_refs_cached(market: str, categories=(), root="data/policies"):
+    """styleguide_refs for the same selection select_rules_cached returns, built once per policy tree fingerprint."""
+    return _styleguide_refs_at(os.path.abspath(root), policies_fingerprint(root), market, tuple(categories))
+
+def refresh_rules():
+    """Drop cached packs and selections (e.g. after editing a pack within the same second)."""
+    _load_all_rules_at.cache_clear()
+    _select_rules_at.cache_clear()
+    _compiled_rules_at.cache_clear()
+    _styleguide_refs_at.cache_clear()
+
 def _norm(s): return (s or "").strip().lower()
 
-def _cat_match(rule_scope_cats, want_cats):
-    # If caller passes [] -> accept all
-    if not want_cats:
+def _want_cats(categories):
+    """Caller categories normalized once per select_rules call; None means accept all."""
+    if not categories:
+        return None
+    return frozenset(_norm(c) for c in categories if c)
+
+def _cat_match(rule_scope_cats, want):
+    # want comes from _want_cats(): None -> accept all
+    if want is None:
         return True
     if not rule_scope_cats:
         return True
-    rc = [_norm(c) for c in rule_scope_cats]
-    wc = [_norm(c) for c in want_cats if c]
-    for a in rc:
-        for b in wc:
-            if a == b or a in b or b in a:
-                return True
-    return False
+    rc = {_norm(c) for c in rule_scope_cats}
+    # Exact matches are the common case; substring matching is the fallback.
+    if not rc.isdisjoint(want):
+        return True
+    return any(a in b or b in a for a in rc for b in want)
 
 def select_rules(packs, market: str, categories: list[str]):
+    want = _want_cats(categories)
     sel = []
     for p in packs:
         meta = p.get("meta") or {}
         for r in p.get("rules", []) or []:
             scope = r.get("scope") or {}
             ok_market = (not scope.get("market")) or (market in scope["market"])
-            ok_cat    = _cat_match(scope.get("categories"), categories)
-            if ok_market and ok_cat:
+            if ok_market and _cat_match(scope.get("categories"), want):
                 # Attach policy_id for traceability
                 r = dict(r)
                 r["policy_id"] = meta.get("policy_id", "unknown_policy")
                 sel.append(r)
     return sel
+
+def known_markets(packs) -> list[str]:
+    """Markets named by any pack meta or rule scope, in first-seen order."""
+    seen: dict[str, None] = {}
+    for p in packs:
+        m = (p.get("meta") or {}).get("market")
+        if isinstance(m, str) and m:
+            seen.setdefault(m, None)
+        for r in p.get("rules", []) or []:
+            for m in ((r.get("scope") or {}).get("market") or []):
+                seen.setdefault(m, None)
+    return list(seen)
@@ -15,6 +15,7 @@ from .models import SKU, SectionScores
 UNITS   = re.compile(r'\b(oz|fl\s*oz|lb|g|kg|ml|l|pack|count|ct|sticks?)\b', re.I)
 FLAVOR  = re.compile(r'\b(vanilla|chocolate|strawberry|watermelon|orange|cherry|lime|grape|lemon|raspberry)\b', re.I)
 NUMBERS = re.compile(r'\b\d+[xX]?\b')
+END_PUNCT = ('.', ';', ':', '!')
 
 
 def score_title(sku: SKU) -> SectionScores:
@@ -32,14 +33,27 @@ def score_title(sku: SKU) -> SectionScores:
 
 def score_bullets(sku: SKU) -> SectionScores:
     bs = sku.bullets or []
-    avg_len: Optional[float] = (sum(len(b) for b in bs)/len(bs)) if bs else None
-    end_punct = sum(1 for b in bs if b.strip().endswith(('.', ';', ':', '!'))) if bs else None
-    unique_ratio = (len(set(b.strip().lower() for b in bs))/len(bs)) if bs else None
+    if not bs:
+        return SectionScores(section='bullets', metrics={
+            'count': None, 'avg_len': None, 'end_punct_count': None, 'unique_ratio': None
+        })
+    # One pass for length, ending punctuation and distinct (normalized) bullets
+    total = 0
+    end_punct = 0
+    uniq = set()
+    for b in bs:
+        total += len(b)
+        s = b.strip()
+        if s.endswith(END_PUNCT):
+            end_punct += 1
+        uniq.add(s.lower())
+    n = len(bs)
+    avg_len: Optional[float] = total / n
     return SectionScores(section='bullets', metrics={
-        'count': float(len(bs)) if bs else None,
+        'count': float(n),
         'avg_len': avg_len,
         'end_punct_count': end_punct,
-        'unique_ratio': unique_ratio
+        'unique_ratio': len(uniq) / n
     })
 
 
@@ -1,9 +1,10 @@
 # src/skill.py
 from __future__ import annotations
+from dataclasses import fields
 from typing import Dict, Any, List
-from src.loaders import load_csv, select_skus
-from src.preprocess import preprocess
-from src.rules_registry import load_all_rules, select_rules
+from src.loaders import load_indexed_csv, select_skus
+from src.preprocess import preprocess_cached
+from src.rules_registry import compiled_rules_cached, styleguide_refs_cached
 from src.rules_engine import validate_with_rules
 from src.scoring import score_all
 from src.compare import compare_sections
@@ -15,6 +16,12 @@ DATA_PATH = "data/asin_data_filled.csv"
 POLICY_PATH = "data/policies"
 DEFAULT_MARKET = "AE"
 
+# Fields models.Recommendation accepts, read once instead of probing its constructor per rec
+_REC_PARAMS = frozenset(f.name for f in fields(Recommendation))
+
+# Bullet markers and padding stripped from each bullet
+_BULLET_STRIP = "-• \t"
+
 # ---------- helpers ----------
 def _get_attr(o, *names, default=None):
     for n in names:
@@ -24,6 +31,23 @@ def _get_attr(o, *names, default=None):
             return o[n]
     return default
 
+_MISSING = object()
+
+def _dict_rec_fields(r):
+    # Plain dicts (LLM JSON, fallbacks): the field names are never dict attributes, so keys suffice
+    get = r.get
+    section = r["section"] if "section" in r else get("type")
+    return (section, get("title", _MISSING), get("before", ""), get("after", ""),
+            get("rationale", ""), get("references", []))
+
+def _any_rec_fields(r):
+    return (_get_attr(r, "section", "type", default=None), _get_attr(r, "title", default=_MISSING),
+            _get_attr(r, "before", default=""), _get_attr(r, "after", default=""),
+            _get_attr(r, "rationale", default=""), _get_attr(r, "references", default=[]))
+
+# (section, title, before, after, rationale, references) extractor per rec type
+_REC_FIELDS = {dict: _dict_rec_fields}
+
 def _coerce_list(x):
     """
     Normalizes bullets into a clean list (accepts list or multiline string).
@@ -31,16 +55,10 @@ def _coerce_list(x):
     if x is None:
         return []
     if isinstance(x, list):
-        cleaned = []
-        for item in x:
-            text = str(item).strip()
-            text = text.lstrip("-• \t")
-            if text:
-                cleaned.append(text)
-        return cleaned
+        return [text for item in x if (text := str(item).strip().lstrip(_BULLET_STRIP))]
     if isinstance(x, str):
-        parts = [p.strip("-• \t") for p in x.split("\n")]
-        return [p for p in parts if p]
+        # splitlines also drops the '\r' of CRLF-separated bullets
+        return [text for part in x.splitlines() if (text := part.strip(_BULLET_STRIP))]
     return [str(x).strip()]
 
 def _normalize_recs(recs):
@@ -49,22 +67,24 @@ def _normalize_recs(recs):
     """
     out = []
     for r in (recs or []):
-        section = _get_attr(r, "section", "type", default=None)
+        section, title, before, after, rationale, references = _REC_FIELDS.get(type(r), _any_rec_fields)(r)
         if not section:
-            t = (_get_attr(r, "title", default="") or "").lower()
+            t = ("" if title is _MISSING else title or "").lower()
             if "title" in t: section = "title"
             elif "bullet" in t: section = "bullets"
             elif "description" in t: section = "description"
             else: section = "unknown"
         if section:
             section = str(section).strip().lower()
+        if title is _MISSING:
+            title = section.title() if section else "Suggestion"
         out.append({
             "section": section,
-            "title": _get_attr(r, "title", default=section.title() if section else "Suggestion"),
-            "before": _get_attr(r, "before", default=""),
-            "after":  _get_attr(r, "after",  default=""),
-            "rationale": _get_attr(r, "rationale", default=""),
-            "references": _get_attr(r, "references", default=[]) or [],
+            "title": title,
+            "before": before,
+            "after":  after,
+            "rationale": rationale,
+            "references": references or [],
         })
     return out
 
@@ -78,7 +98,7 @@ def _rule_fallbacks(client: SKU, competitor: SKU, client_findings, top_n=3):
     bullets_fail = any((not f.passed) and f.section == "bullets" for f in client_findings)
     if bullets_fail and len(suggestions) < top_n:
         before_bs = _coerce_list(client.bullets or [])
-        after_bs = [(b.rstrip().rstrip(".;:!")) for b in before_bs][:5]
+        after_bs = [b.rstrip().rstrip(".;:!") for b in before_bs[:5]]
         if not after_bs and client.title:
             after_bs = [t.strip() for t in client.title.split(",")[:5]]
         suggestions.append({
@@ -120,10 +140,12 @@ def _rule_fallbacks(client: SKU, competitor: SKU, client_findings, top_n=3):
         })
 
     # Opportunity: clarify flavors if title has “Variety”
-    if len(suggestions) < top_n and (client.title or "") and "variety" in (client.title or "").lower():
-        after_title = client.title
-        flavors = ["Orange", "Cherry Lime", "Watermelon"]
-        if not any(f.lower() in after_title.lower() for f in flavors):
+    title = client.title or ""
+    # Lowercase once and reuse it for the flavor check
+    if len(suggestions) < top_n and title and "variety" in (title_lc := title.lower()):
+        after_title = title
+        flavors = ("orange", "cherry lime", "watermelon")
+        if not any(f in title_lc for f in flavors):
             after_title = after_title.replace("Variety Pack", "Variety Pack (Orange, Cherry Lime, Watermelon)")
         suggestions.append({
             "section": "title",
@@ -139,30 +161,28 @@ def _rule_fallbacks(client: SKU, competitor: SKU, client_findings, top_n=3):
 def _to_rec_obj(r: Dict[str, Any]):
     """
     Convert normalized dict -> your models.Recommendation.
-    Avoid passing fields (like 'section' or 'references') that the dataclass may not accept.
+    Only passes the fields the dataclass declares (see _REC_PARAMS).
     """
-    try:
-        # common case: Recommendation(title, before, after, rationale=...)
-        return Recommendation(
-            title=r.get("title") or "Suggestion",
-            before=r.get("before") or "",
-            after=r.get("after") or "",
-            rationale=r.get("rationale") or ""
-        )
-    except TypeError:
-        # fallback if your dataclass doesn't have 'rationale'
-        return Recommendation(
-            title=r.get("title") or "Suggestion",
-            before=r.get("before") or "",
-            after=r.get("after") or ""
-        )
+    values = {
+        "title": r.get("title") or "Suggestion",
+        "before": r.get("before") or "",
+        "after": r.get("after") or "",
+        "rationale": r.get("rationale") or "",
+        "references": r.get("references") or [],
+    }
+    return Recommendation(**{k: v for k, v in values.items() if k in _REC_PARAMS})
 
 
 # ---------- main orchestration ----------
 def run_compare(client_id: str,
                 competitor_id: str,
                 csv_path: str = DATA_PATH,
-                market: str = DEFAULT_MARKET) -> Dict[str, Any]:
+                market: str = DEFAULT_MARKET,
+                *,
+                include_report: bool = True,
+                include_suggestions: bool = True,
+                include_draft: bool = True,
+                include_comparison: bool = True) -> Dict[str, Any]:
     """
     Full pipeline:
       - load + preprocess
@@ -172,26 +192,44 @@ def run_compare(client_id: str,
       - seed draft from suggestions
       - render full markdown report (with findings)
     Returns a dict with report, draft, suggestions, findings, comparison, and SKU objects.
+
+    The include_* flags skip stages nobody asked for; skipped sections come back
+    empty. Suggestions still run when the draft or report needs them.
     """
     # Load + preprocess
-    df = load_csv(csv_path)
-    c_row, k_row = select_skus(df, client_id, competitor_id)
-    client_p, comp_p = preprocess(c_row), preprocess(k_row)
+    df, sku_index = load_indexed_csv(csv_path)
+    c_row, k_row = select_skus(df, client_id, competitor_id, index=sku_index)
+    client_p, comp_p = preprocess_cached(c_row), preprocess_cached(k_row)
 
     # Rules
-    packs = load_all_rules(POLICY_PATH)
-    rules = select_rules(packs, market=market, categories=[])
+    rules = compiled_rules_cached(market, root=POLICY_PATH)
 
     # Validate
     client_find = validate_with_rules(client_p, rules)
     comp_find   = validate_with_rules(comp_p, rules)
 
+    need_recs = include_suggestions or include_draft or include_report
+    result: Dict[str, Any] = {
+        "client": client_p,
+        "competitor": comp_p,
+        "comparison": [],
+        "report_markdown": "",
+        "draft": {},
+        "suggestions": [],
+        "findings": {"client": client_find, "competitor": comp_find},
+    }
+    if not (need_recs or include_comparison):
+        return result
+
     # Score + compare
     c_scores, k_scores = score_all(client_p), score_all(comp_p)
     comparison = compare_sections(client_p, comp_p, c_scores, k_scores, client_find, comp_find)
+    result["comparison"] = comparison
+    if not need_recs:
+        return result
 
     # Suggestions (LLM → normalize → drop empties → fallbacks → exactly 3)
-    styleguide_refs = [f"{r.get('policy_id','')}:{r['id']} – {r.get('message','')}".strip(": ") for r in rules]
+    styleguide_refs = styleguide_refs_cached(market, root=POLICY_PATH)
     recs_raw = suggest_edits_llm(client_p, comp_p, comparison, styleguide_refs)
     recs_norm = _normalize_recs(recs_raw)
     recs_norm = [r for r in recs_norm if r.get("after")]
@@ -202,14 +240,14 @@ def run_compare(client_id: str,
     # recs_objs = [_to_rec_obj(r) for r in recs_norm]
 
     # Seed draft
-    def _first_after(section_name: str):
-        for r in recs_norm:
-            if r["section"] == section_name and r.get("after"):
-                return r["after"]
-        return None
-    title_after   = _first_after("title")
-    bullets_after = _first_after("bullets")
-    desc_after    = _first_after("description")
+    # First suggested "after" per section, in one pass over the recs
+    first_after: Dict[str, Any] = {}
+    for r in recs_norm:
+        if r.get("after"):
+            first_after.setdefault(r["section"], r["after"])
+    title_after   = first_after.get("title")
+    bullets_after = first_after.get("bullets")
+    desc_after    = first_after.get("description")
 
     draft = {
         "title": (title_after if isinstance(title_after, str) and title_after.strip() else (client_p.title or "")),
@@ -217,17 +255,12 @@ def run_compare(client_id: str,
         "description": (desc_after if isinstance(desc_after, str) and desc_after.strip() else (client_p.description or "")),
     }
 
-    # Render report (renderer already supports findings & policy sections)
-    report_md = render_markdown_report(
-    client_p, comp_p, comparison, recs_norm, False, client_find, comp_find)
+    result["draft"] = draft
+    result["suggestions"] = recs_norm          # exactly 3
 
+    # Render report (renderer already supports findings & policy sections)
+    if include_report:
+        result["report_markdown"] = render_markdown_report(
+        client_p, comp_p, comparison, recs_norm, False, client_find, comp_find)
 
-    return {
-        "client": client_p,
-        "competitor": comp_p,
-        "comparison": comparison,
-        "report_markdown": report_md,
-        "draft": draft,
-        "suggestions": recs_norm,          # exactly 3
-        "findings": {"client": client_find, "competitor": comp_find},
-    }
+    return result
@@ -0,0 +1,62 @@
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src import api, recommender
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    # POLICY_ROOT and the default csv_path are relative to the repo root
+    monkeypatch.chdir(REPO_ROOT)
+    monkeypatch.setattr(recommender, "_llm_available", lambda: False)
+    with TestClient(api.app) as c:
+        yield c
+
+
+@pytest.fixture
+def compare_body(tmp_path):
+    csv_path = tmp_path / "catalog.csv"
+    shutil.copy(REPO_ROOT / "data" / "asin_data_filled.csv", csv_path)
+    return {"client_id": "B0BPN423GH", "competitor_id": "B0BGR4FTZS", "csv_path": str(csv_path)}
+
+
+def test_compare_returns_etag(client, compare_body):
+    r = client.post("/compare", json=compare_body)
+
+    assert r.status_code == 200
+    assert r.headers["etag"].startswith('"')
+    assert r.headers["cache-control"] == api.COMPARE_CACHE_CONTROL
+    assert len(r.json()["suggestions"]) == 3
+
+
+def test_matching_if_none_match_gives_304(client, compare_body):
+    etag = client.post("/compare", json=compare_body).headers["etag"]
+
+    r = client.post("/compare", json=compare_body, headers={"If-None-Match": etag})
+
+    assert r.status_code == 304
+    assert r.headers["etag"] == etag
+    assert r.content == b""
+
+
+def test_wildcard_if_none_match_is_not_a_304(client, compare_body):
+    r = client.post("/compare", json=compare_body, headers={"If-None-Match": "*"})
+
+    assert r.status_code == 200
+
+
+def test_csv_mtime_bump_changes_etag(client, compare_body):
+    etag = client.post("/compare", json=compare_body).headers["etag"]
+    st = os.stat(compare_body["csv_path"])
+    os.utime(compare_body["csv_path"], ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+    r = client.post("/compare", json=compare_body, headers={"If-None-Match": etag})
+
+    assert r.status_code == 200
+    assert r.headers["etag"] != etag
@@ -0,0 +1,25 @@
+from src.llm_json import decode_json_array
+
+
+def test_plain_array():
+    assert decode_json_array('[{"id": "R1"}, {"id": "R2"}]') == [{"id": "R1"}, {"id": "R2"}]
+
+
+def test_prose_with_bracketed_aside():
+    reply = 'Here are the rules [draft, see notes]:\n```json\n[{"id": "R1", "scope": {"market": ["AE"]}}]\n```\nDone [1].'
+    assert decode_json_array(reply) == [{"id": "R1", "scope": {"market": ["AE"]}}]
+
+
+def test_truncated_array_returns_none():
+    reply = '[{"id": "R1", "scope": {"market": ["AE"]}}, {"id": "R2", "scope": {"market": ["AE"], "categories": ["Pet'
+    assert decode_json_array(reply) is None
+
+
+def test_trailing_comma_returns_none():
+    reply = '[{"title": "Bullets", "references": ["Guide: Bullets"]},]'
+    assert decode_json_array(reply) is None
+
+
+def test_array_of_non_objects_is_skipped():
+    assert decode_json_array('Scores [1, 2, 3] then [{"id": "R1"}]') == [{"id": "R1"}]
+    assert decode_json_array('no array here') is None
@@ -0,0 +1,30 @@
+import pandas as pd
+
+from src.loaders import iter_skus, row_to_sku
+
+
+def _frame():
+    # Primary aliases are NaN (as read_csv leaves empty cells); secondary ones are filled
+    return pd.DataFrame({
+        "product_id": [float("nan")],
+        "sku": ["X1"],
+        "title": ["A title"],
+        "bullet_points": [float("nan")],
+        "about_this_item": ["first||second"],
+        "image_url": [float("nan")],
+        "image_urls": ["u1|u2"],
+    })
+
+
+def test_nan_primary_alias_falls_through_to_secondary():
+    sku = row_to_sku(_frame().iloc[0])
+
+    assert sku.sku_id == "X1"
+    assert sku.bullets == ["first", "second"]
+    assert sku.image_urls == ["u1", "u2"]
+
+
+def test_iter_skus_matches_row_to_sku():
+    df = _frame()
+
+    assert list(iter_skus(df)) == [row_to_sku(df.iloc[0])]
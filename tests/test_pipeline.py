@@ -0,0 +1,20 @@
+from pathlib import Path
+
+from src import pipeline, recommender
+from src.models import Recommendation
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_run_compare_offline_on_bundled_pair(monkeypatch):
+    # Bundled paths are relative to the repo root; force the deterministic suggestions
+    monkeypatch.chdir(REPO_ROOT)
+    monkeypatch.setattr(recommender, "_llm_available", lambda: False)
+
+    result = pipeline.run_compare("B0BPN423GH", "B0BGR4FTZS")
+
+    assert len(result["suggestions"]) == 3
+    assert all(isinstance(r, Recommendation) for r in result["suggestions"])
+    assert result["client"].sku_id == "B0BPN423GH"
+    assert result["draft"]["title"]
+    assert result["report_markdown"]
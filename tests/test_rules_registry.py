@@ -0,0 +1,39 @@
+import os
+import shutil
+from pathlib import Path
+
+from src.rules_registry import load_all_rules, policies_fingerprint, select_rules, select_rules_cached
+
+POLICIES = Path(__file__).resolve().parents[1] / "data" / "policies"
+
+
+def _policy_copy(tmp_path):
+    root = tmp_path / "policies"
+    shutil.copytree(POLICIES, root)
+    pack = next(p for p in root.iterdir() if p.is_dir())
+    # rules.yaml older than meta.yaml, so it is never the newest file in the tree
+    os.utime(pack / "rules.yaml", ns=(1_000_000_000, 1_000_000_000))
+    return root, pack
+
+
+def test_deleting_an_older_pack_file_invalidates_cache(tmp_path):
+    root, pack = _policy_copy(tmp_path)
+    assert select_rules_cached("AE", root=str(root))
+
+    (pack / "rules.yaml").unlink()
+
+    assert select_rules(load_all_rules(root), market="AE", categories=[]) == []
+    assert select_rules_cached("AE", root=str(root)) == []
+
+
+def test_replacing_a_pack_file_with_same_mtime_invalidates_cache(tmp_path):
+    root, pack = _policy_copy(tmp_path)
+    rules_path = pack / "rules.yaml"
+    before = select_rules_cached("AE", root=str(root))
+    fingerprint = policies_fingerprint(str(root))
+
+    rules_path.write_text("rules: []\n", encoding="utf-8")
+    os.utime(rules_path, ns=(1_000_000_000, 1_000_000_000))
+
+    assert policies_fingerprint(str(root)) != fingerprint
+    assert before and select_rules_cached("AE", root=str(root)) == []